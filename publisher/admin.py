@@ -6,13 +6,21 @@ from django.contrib import messages
 from django.conf.urls import url
 from django.core.exceptions import PermissionDenied
 from django.core.urlresolvers import reverse
-from django.http import Http404, HttpResponseRedirect, HttpResponse
+from django.http import (
+    Http404, HttpResponse, HttpResponseBadRequest, HttpResponseNotAllowed, HttpResponseRedirect,
+)
 from django.utils.encoding import force_text
 from django.utils.html import escape
 from django.utils.translation import ugettext_lazy as _
 from django import forms
+from django.db.models import Prefetch
 from django.template import loader, Context
 
+from .bulk import bulk_publish, bulk_unpublish
+from .databases import prefetch_live_copies
+from .middleware import get_preview_url
+from .relations import get_published_pks
+
 
 def make_published(modeladmin, request, queryset):
     for row in queryset.all():
@@ -112,6 +120,9 @@ class PublisherAdmin(ModelAdmin):
         self.changelist_reverse = '%s:%schangelist' % (
             self.admin_site.name,
             self.url_name_prefix, )
+        self.batch_reverse = '%s:%sbatch' % (
+            self.admin_site.name,
+            self.url_name_prefix, )
 
     def has_publish_permission(self, request, obj=None):
         opts = self.opts
@@ -146,16 +157,22 @@ class PublisherAdmin(ModelAdmin):
         template_name = 'publisher/change_list_publish.html'
 
         is_published = False
-        if obj.publisher_linked and obj.is_draft:
+        if obj.is_draft and obj.get_published_version():
             is_published = True
 
+        preview_url = None
+        if is_published and callable(getattr(obj, 'get_absolute_url', None)):
+            preview_url = get_preview_url(obj.get_absolute_url(), self.request.user)
+
         t = loader.get_template(template_name)
         c = Context({
             'object': obj,
             'is_published': is_published,
+            'preview_url': preview_url,
             'has_publish_permission': self.has_publish_permission(self.request, obj),
             'publish_url': reverse(self.publish_reverse, args=(obj.pk, )),
             'unpublish_url': reverse(self.unpublish_reverse, args=(obj.pk, )),
+            'batch_url': reverse(self.batch_reverse),
         })
         if django.VERSION >= (1, 10):
             return t.render(c.flatten())
@@ -168,6 +185,7 @@ class PublisherAdmin(ModelAdmin):
         # hack! We need request.user to check user publish perms
         self.request = request
         qs = self.model.publisher_manager.drafts()
+        qs = qs.select_related(self.get_published_related_name())
         ordering = self.get_ordering(request)
         if ordering:
             qs = qs.order_by(*ordering)
@@ -175,14 +193,36 @@ class PublisherAdmin(ModelAdmin):
 
     queryset = get_queryset
 
+    def get_changelist(self, request, **kwargs):
+        changelist_class = super(PublisherAdmin, self).get_changelist(request, **kwargs)
+        if not self.model.publisher_database:
+            return changelist_class
+
+        class PublisherChangeList(changelist_class):
+
+            def get_results(self, request):
+                super(PublisherChangeList, self).get_results(request)
+                # The live copies can't be joined, load the ones of the page at once
+                prefetch_live_copies(self.model, self.result_list)
+
+        return PublisherChangeList
+
+    def get_published_related_name(self):
+        # Relation to the published version, loaded with the drafts of the changelist
+        if self.model.publisher_split_storage:
+            return 'publisher_published'
+        return 'publisher_linked'
+
     def get_urls(self):
         urls = super(PublisherAdmin, self).get_urls()
 
         publish_name = '%spublish' % (self.url_name_prefix, )
         unpublish_name = '%sunpublish' % (self.url_name_prefix, )
         revert_name = '%srevert' % (self.url_name_prefix, )
+        batch_name = '%sbatch' % (self.url_name_prefix, )
 
         publish_urls = [
+            url(r'^batch/$', self.admin_site.admin_view(self.batch_view), name=batch_name),
             url(r'^(?P<object_id>\d+)/publish/$', self.publish_view, name=publish_name),
             url(r'^(?P<object_id>\d+)/unpublish/$', self.unpublish_view, name=unpublish_name),
             url(r'^(?P<object_id>\d+)/revert/$', self.revert_view, name=revert_name),
@@ -249,6 +289,46 @@ class PublisherAdmin(ModelAdmin):
 
         return http_json_response({'success': True})
 
+    def batch_view(self, request):
+        """
+        Publish and unpublish many objects at once, on the bulk path.
+
+        Expects the ``publish`` and ``unpublish`` ids in the POST data, and returns whether each
+        object is published afterwards.
+        """
+        if request.method != 'POST':
+            return HttpResponseNotAllowed(['POST'])
+
+        if not self.has_change_permission(request) or not self.has_publish_permission(request):
+            raise PermissionDenied
+
+        try:
+            publish_ids = set(int(pk) for pk in request.POST.getlist('publish'))
+            unpublish_ids = set(int(pk) for pk in request.POST.getlist('unpublish'))
+        except ValueError:
+            return HttpResponseBadRequest()
+        if publish_ids & unpublish_ids:
+            return HttpResponseBadRequest()
+
+        drafts = self.model.publisher_manager.drafts()
+        if publish_ids:
+            bulk_publish(self.model, drafts.filter(pk__in=publish_ids))
+        if unpublish_ids:
+            bulk_unpublish(self.model, drafts.filter(pk__in=unpublish_ids))
+
+        requested_ids = publish_ids | unpublish_ids
+        found = set(drafts.filter(pk__in=requested_ids).values_list('pk', flat=True))
+        published = get_published_pks(self.model, found)
+
+        results = {}
+        for pk in requested_ids:
+            results[str(pk)] = {
+                'success': pk in found,
+                'published': pk in published,
+            }
+
+        return http_json_response({'success': True, 'results': results})
+
     def render_change_form(self, request, context, add=False, change=False, form_url='', obj=None):
         obj = context.get('original', None)
         if not obj:
@@ -266,14 +346,16 @@ class PublisherAdmin(ModelAdmin):
 
             preview_draft_btn = None
             if callable(getattr(obj, 'get_absolute_url', None)):
-                preview_draft_btn = True
+                preview_draft_btn = get_preview_url(obj.get_absolute_url(), request.user)
+
+            published_obj = obj.get_published_version()
 
             unpublish_btn = None
-            if obj.is_draft and obj.publisher_linked:
+            if obj.is_draft and published_obj:
                 unpublish_btn = reverse(self.unpublish_reverse, args=(obj.pk, ))
 
             revert_btn = None
-            if obj.is_dirty and obj.publisher_linked:
+            if obj.is_dirty and published_obj:
                 revert_btn = reverse(self.revert_reverse, args=(obj.pk, ))
 
             context.update({
@@ -289,38 +371,51 @@ class PublisherAdmin(ModelAdmin):
 
 try:
     from hvad.admin import TranslatableAdmin
-    from hvad.manager import FALLBACK_LANGUAGES
 except ImportError:
     pass
 else:
+    try:
+        # django-hvad < 1.0
+        from hvad.manager import FALLBACK_LANGUAGES
+    except ImportError:
+        FALLBACK_LANGUAGES = None
+
     class PublisherHvadAdmin(TranslatableAdmin, PublisherAdmin):
         change_form_template = 'publisher/hvad/change_form.html'
 
-        def queryset(self, request):
+        def get_queryset(self, request):
             # hack! We need request.user to check user publish perms
             self.request = request
             language = self._language(request)
-            languages = [language]
-            for lang in FALLBACK_LANGUAGES:
-                if lang not in languages:
-                    languages.append(lang)
-            qs = self.model._default_manager.untranslated().use_fallbacks(*languages)
+            if FALLBACK_LANGUAGES is None:
+                # The translations are joined, the fallbacks fetched for the whole page at once
+                qs = self.model._default_manager.language(language).fallbacks()
+            else:
+                languages = [language]
+                for lang in FALLBACK_LANGUAGES:
+                    if lang not in languages:
+                        languages.append(lang)
+                qs = self.model._default_manager.untranslated().use_fallbacks(*languages)
             qs = qs.filter(publisher_is_draft=True)
+            qs = qs.select_related(self.get_published_related_name())
             ordering = getattr(self, 'ordering', None) or ()
             if ordering:
                 qs = qs.order_by(*ordering)
             return qs
 
+        queryset = get_queryset
+
 
 try:
     from parler.admin import TranslatableAdmin as PTranslatableAdmin
+    from parler.utils.i18n import get_active_language_choices
 except ImportError:
     pass
 else:
     class PublisherParlerAdmin(PTranslatableAdmin, PublisherAdmin):
         change_form_template = 'publisher/parler/change_form.html'
 
-        def queryset(self, request):
+        def get_queryset(self, request):
             # hack! We need request.user to check user publish perms
             self.request = request
             qs = self.model.objects
@@ -328,11 +423,27 @@ else:
             if qs_language:
                 qs = qs.language(qs_language)
             qs = qs.filter(publisher_is_draft=True)
+            qs = qs.select_related(self.get_published_related_name())
+            qs = qs.prefetch_related(*self.get_translation_prefetches(qs_language))
             ordering = getattr(self, 'ordering', None) or ()
             if ordering:
                 qs = qs.order_by(*ordering)
             return qs
 
+        queryset = get_queryset
+
+        def get_translation_prefetches(self, language_code):
+            """
+            Prefetch the translations of the active language and its fallbacks for the whole
+            changelist page.
+            """
+            languages = get_active_language_choices(language_code)
+            return [
+                Prefetch(meta.rel_name, queryset=meta.model.objects.filter(
+                    language_code__in=languages))
+                for meta in self.model._parler_meta
+            ]
+
 
 class PublisherPublishedFilter(SimpleListFilter):
     title = _('Published')
@@ -351,4 +462,28 @@ class PublisherPublishedFilter(SimpleListFilter):
             return queryset
 
         isnull = not value
+        if queryset.model.publisher_database:
+            # Only published drafts have a publication date
+            return queryset.filter(publisher_published_at__isnull=isnull)
+        if queryset.model.publisher_split_storage:
+            return queryset.filter(publisher_published__isnull=isnull)
         return queryset.filter(publisher_linked__isnull=isnull)
+
+
+class PublisherDirtyFilter(SimpleListFilter):
+    title = _('Unpublished changes')
+    parameter_name = 'dirty'
+
+    def lookups(self, request, model_admin):
+        return (
+            ('1', _('Yes')),
+            ('0', _('No'))
+        )
+
+    def queryset(self, request, queryset):
+        try:
+            value = int(self.value())
+        except TypeError:
+            return queryset
+
+        return queryset.filter(publisher_is_dirty=bool(value))
@@ -0,0 +1,43 @@
+import functools
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections
+
+_executor = {}
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Return the thread pool running the publishing operations awaited from asyncio code.
+
+    Its size, ``PUBLISHER_ASYNC_WORKERS``, bounds the operations running at once.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    with _executor_lock:
+        if 'executor' not in _executor:
+            _executor['executor'] = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'PUBLISHER_ASYNC_WORKERS', 4))
+        return _executor['executor']
+
+
+def call_with_connection(func, args, kwargs):
+    # Like a request, each call drops the database connection it has worn out
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+def run_in_executor(func, *args, **kwargs):
+    """
+    Run ``func`` in the publisher thread pool and return an asyncio future of its result.
+    """
+    import asyncio
+
+    loop = asyncio.get_event_loop()
+    return loop.run_in_executor(
+        get_executor(), functools.partial(call_with_connection, func, args, kwargs))
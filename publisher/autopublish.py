@@ -0,0 +1,98 @@
+from collections import OrderedDict
+from datetime import timedelta
+from operator import itemgetter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .signals import publisher_post_unpublish
+from .utils import iter_keyset_batches
+
+
+def get_auto_publish_settings():
+    return {
+        'delay': timedelta(seconds=getattr(settings, 'PUBLISHER_AUTO_PUBLISH_DELAY', 10)),
+        # None lets repeated saves postpone the publish indefinitely
+        'max_delay': getattr(settings, 'PUBLISHER_AUTO_PUBLISH_MAX_DELAY', None),
+    }
+
+
+def schedule_auto_publish(draft):
+    """
+    Publish ``draft`` once it hasn't been saved for ``PUBLISHER_AUTO_PUBLISH_DELAY`` seconds.
+
+    Each save postpones the pending publish of the draft rather than adding another one.
+    """
+    from django.contrib.contenttypes.models import ContentType
+    from .models import PublisherPendingPublish
+
+    content_type = ContentType.objects.get_for_model(draft.__class__)
+    due_at = timezone.now() + get_auto_publish_settings()['delay']
+
+    updated = PublisherPendingPublish.objects.filter(
+        content_type=content_type, object_id=draft.pk).update(due_at=due_at)
+    if not updated:
+        PublisherPendingPublish.objects.get_or_create(
+            content_type=content_type, object_id=draft.pk, defaults={'due_at': due_at})
+
+
+def cancel_auto_publish(draft):
+    from django.contrib.contenttypes.models import ContentType
+    from .models import PublisherPendingPublish
+
+    content_type = ContentType.objects.get_for_model(draft.__class__)
+    PublisherPendingPublish.objects.filter(
+        content_type=content_type, object_id=draft.pk).delete()
+
+
+def get_due_filter(now):
+    due = Q(due_at__lte=now)
+    max_delay = get_auto_publish_settings()['max_delay']
+    if max_delay is not None:
+        due |= Q(created_at__lte=now - timedelta(seconds=max_delay))
+    return due
+
+
+def publish_pending(now=None, batch_size=1000):
+    """
+    Publish the drafts whose pending publish is due, with a bulk publish per model and batch,
+    and return the number of published drafts.
+
+    The pending publishes postponed by a save in the meantime are kept.
+    """
+    from django.contrib.contenttypes.models import ContentType
+    from .models import PublisherPendingPublish
+
+    if now is None:
+        now = timezone.now()
+    due = PublisherPendingPublish.objects.filter(get_due_filter(now))
+    entries_qs = due.values_list('pk', 'content_type', 'object_id')
+
+    published = 0
+    for entries in iter_keyset_batches(entries_qs, batch_size, get_key=itemgetter(0)):
+        object_ids = OrderedDict()
+        for pk, content_type_id, object_id in entries:
+            object_ids.setdefault(content_type_id, []).append(object_id)
+
+        with transaction.atomic():
+            for content_type_id, pks in object_ids.items():
+                model = ContentType.objects.get_for_id(content_type_id).model_class()
+                if model is None:
+                    # The model has been removed
+                    continue
+                drafts = model.publisher_manager.drafts().filter(pk__in=pks)
+                published += len(model.publisher_manager.bulk_publish(drafts))
+
+            due.filter(pk__in=[entry[0] for entry in entries]).delete()
+
+    return published
+
+
+def publisher_auto_publish_cancelled(sender, instance, **kwargs):
+    if getattr(sender, 'publisher_auto_publish', False):
+        cancel_auto_publish(instance)
+
+
+publisher_post_unpublish.connect(publisher_auto_publish_cancelled)
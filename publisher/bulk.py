@@ -0,0 +1,228 @@
+from django.db import transaction
+from django.db.models import Case, IntegerField, Value, When
+from django.db.models.query import QuerySet
+from django.utils import timezone
+
+from .signals import (
+    publisher_publish_pre_save_draft,
+    publisher_pre_publish,
+    publisher_post_publish,
+    publisher_pre_unpublish,
+    publisher_post_unpublish,
+)
+from .databases import copy_to_database, prefetch_live_copies
+from .hashing import fill_content_hash, has_content_hash
+from .relations import get_relation_cloner
+from .translations import get_translation_cloner
+from .versions import record_version
+
+# Maximum number of WHEN clauses in a single UPDATE linking drafts to their published copies
+LINK_BATCH_SIZE = 500
+
+
+def get_drafts(model, drafts):
+    if drafts is None:
+        drafts = model._default_manager.all()
+    if isinstance(drafts, QuerySet):
+        drafts = drafts.filter(publisher_is_draft=model.STATE_DRAFT)
+        if model.publisher_split_storage:
+            drafts = drafts.select_related('publisher_published')
+        else:
+            drafts = drafts.select_related('publisher_linked')
+    drafts = [draft for draft in drafts if draft.is_draft]
+    if model.publisher_database:
+        prefetch_live_copies(model, drafts)
+    return drafts
+
+
+def copy_draft(model, draft):
+    """
+    Return an unsaved published copy of ``draft``.
+    """
+    publish_obj = model(**dict(
+        (field.attname, getattr(draft, field.attname))
+        for field in model._meta.concrete_fields
+    ))
+    for fld in draft.publisher_publish_empty_fields:
+        setattr(publish_obj, fld, None)
+    publish_obj.publisher_is_draft = model.STATE_PUBLISHED
+    publish_obj.publisher_is_dirty = False
+    return publish_obj
+
+
+def get_field_values(draft):
+    return [getattr(draft, field.attname) for field in draft._meta.concrete_fields]
+
+
+def create_published_copies(model, drafts):
+    """
+    Insert the published copies of ``drafts`` with a single bulk insert, and return them.
+    """
+    copies = []
+    for draft in drafts:
+        publish_obj = copy_draft(model, draft)
+        # Temporarily point the copy at its draft to find its primary key back
+        publish_obj.publisher_linked_id = draft.pk
+        copies.append(publish_obj)
+    model._default_manager.bulk_create(copies)
+
+    published_pks = dict(
+        model._default_manager.filter(
+            publisher_is_draft=model.STATE_PUBLISHED,
+            publisher_linked__in=[draft.pk for draft in drafts],
+        ).values_list('publisher_linked', 'pk'))
+    for draft, publish_obj in zip(drafts, copies):
+        publish_obj.pk = published_pks[draft.pk]
+        publish_obj.publisher_linked_id = None
+
+    model._default_manager.filter(pk__in=list(published_pks.values())) \
+                          .update(publisher_linked=None)
+
+    # Link the drafts to their published copies
+    for start in range(0, len(drafts), LINK_BATCH_SIZE):
+        batch = list(zip(drafts, copies))[start:start + LINK_BATCH_SIZE]
+        model._default_manager.filter(pk__in=[draft.pk for draft, publish_obj in batch]).update(
+            publisher_linked=Case(
+                *[When(pk=draft.pk, then=Value(publish_obj.pk)) for draft, publish_obj in batch],
+                output_field=IntegerField()))
+    for draft, publish_obj in zip(drafts, copies):
+        draft.publisher_linked = publish_obj
+
+    return copies
+
+
+def create_split_copies(model, drafts):
+    published_model = model.publisher_published_model
+    copies = []
+    for draft in drafts:
+        publish_obj = published_model(publisher_draft_id=draft.pk)
+        for field in published_model._meta.local_fields:
+            if not field.primary_key:
+                setattr(publish_obj, field.attname, getattr(draft, field.attname))
+        publish_obj.publisher_is_draft = model.STATE_PUBLISHED
+        publish_obj.publisher_is_dirty = False
+        copies.append(publish_obj)
+    published_model._default_manager.bulk_create(copies)
+
+    for draft, publish_obj in zip(drafts, copies):
+        draft.clear_published_version_cache()
+        draft.publisher_published = publish_obj
+
+    return copies
+
+
+@transaction.atomic
+def bulk_publish(model, drafts=None):
+    """
+    Publish the dirty ``drafts`` of ``model`` using bulk queries, and return them.
+
+    The number of queries does not depend on the number of drafts, unless the model has
+    placeholders, custom relations cloning or version history.
+    """
+    drafts = [draft for draft in get_drafts(model, drafts) if draft.is_dirty]
+    if not drafts:
+        return []
+
+    if has_content_hash(model):
+        for draft in drafts:
+            fill_content_hash(draft)
+
+    for draft in drafts:
+        publisher_pre_publish.send(sender=model, instance=draft)
+
+    now = timezone.now()
+    first_published = []
+    previous_pks = []
+    for draft in drafts:
+        published_obj = draft.get_published_version()
+        if published_obj is None:
+            draft.publisher_published_at = now
+            first_published.append(draft.pk)
+        else:
+            if not model.publisher_split_storage and not model.publisher_database:
+                draft.patch_placeholders(draft)
+            previous_pks.append(published_obj.pk)
+
+    # Remove the current published records
+    if model.publisher_database:
+        copies = copy_to_database(model, drafts)
+    elif model.publisher_split_storage:
+        model.publisher_published_model._default_manager.filter(pk__in=previous_pks).delete()
+        copies = create_split_copies(model, drafts)
+    else:
+        model._default_manager.filter(pk__in=previous_pks).delete()
+        copies = create_published_copies(model, drafts)
+
+    if first_published:
+        model._default_manager.filter(pk__in=first_published).update(publisher_published_at=now)
+    model._default_manager.filter(pk__in=[draft.pk for draft in drafts]) \
+                          .update(publisher_is_dirty=False)
+    for draft in drafts:
+        draft.publisher_is_dirty = False
+
+    pairs = list(zip(drafts, copies))
+
+    if not model.publisher_database:
+        cloner = get_translation_cloner(model)
+        if cloner is not None and not model.publisher_split_storage:
+            cloner.clone(pairs)
+
+        relation_cloner = get_relation_cloner(model)
+        if relation_cloner is not None:
+            relation_cloner.clone(pairs)
+
+    for draft, publish_obj in pairs:
+        if not model.publisher_database:
+            draft.clone_placeholder(draft, publish_obj)
+        draft.clone_relations(draft, publish_obj)
+
+    values = [get_field_values(draft) for draft in drafts]
+    for draft in drafts:
+        publisher_publish_pre_save_draft.send(sender=model, instance=draft)
+
+    # Like publish(), keep the changes made to the drafts by the receivers
+    for draft, draft_values in zip(drafts, values):
+        if get_field_values(draft) != draft_values:
+            draft.save(suppress_modified=True)
+
+    for draft in drafts:
+        if draft.publisher_versioning:
+            record_version(draft)
+        publisher_post_publish.send(sender=model, instance=draft)
+
+    return drafts
+
+
+@transaction.atomic
+def bulk_unpublish(model, drafts=None):
+    """
+    Unpublish the published ``drafts`` of ``model`` using bulk queries, and return them.
+    """
+    drafts = [draft for draft in get_drafts(model, drafts) if draft.get_published_version()]
+    if not drafts:
+        return []
+
+    for draft in drafts:
+        publisher_pre_unpublish.send(sender=model, instance=draft)
+
+    published_pks = [draft.get_published_version().pk for draft in drafts]
+    if model.publisher_database:
+        model._default_manager.using(model.publisher_database) \
+                              .filter(pk__in=published_pks).delete()
+    elif model.publisher_split_storage:
+        model.publisher_published_model._default_manager.filter(pk__in=published_pks).delete()
+    else:
+        model._default_manager.filter(pk__in=published_pks).delete()
+
+    model._default_manager.filter(pk__in=[draft.pk for draft in drafts]) \
+                          .update(publisher_linked=None, publisher_published_at=None,
+                                  publisher_is_dirty=True)
+
+    for draft in drafts:
+        draft.clear_published_version_cache()
+        draft.publisher_linked = None
+        draft.publisher_published_at = None
+        draft.publisher_is_dirty = True
+        publisher_post_unpublish.send(sender=model, instance=draft)
+
+    return drafts
@@ -0,0 +1,132 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import models
+
+from .signals import publisher_post_publish, publisher_post_unpublish
+from .utils import OnCommitBatch
+
+
+def get_cache_settings():
+    return {
+        'size': getattr(settings, 'PUBLISHER_INSTANCE_CACHE_SIZE', 1000),
+        # None checks the generations once per request
+        'ttl': getattr(settings, 'PUBLISHER_INSTANCE_CACHE_TTL', None),
+    }
+
+
+class PublishedInstanceCache(object):
+    """
+    In-process LRU cache of published instances, keyed by model and lookup.
+
+    The instances are stored as tuples of field values. An entry is dropped once the generation
+    of its model, stored in the database and bumped on each publish, has changed. The
+    generations are loaded with one query, at most once per request or ``ttl`` seconds.
+    """
+
+    def __init__(self, size=1000, ttl=None):
+        self.size = size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.generations = None
+        self.checked_at = None
+        self.lock = threading.Lock()
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.expire()
+
+    def expire(self):
+        # The generations are loaded again on the next access
+        self.checked_at = None
+
+    def get_generations(self):
+        from .models import PublisherGeneration
+
+        now = time.time()
+        if self.checked_at is None or (self.ttl is not None and now - self.checked_at > self.ttl):
+            self.generations = dict(
+                PublisherGeneration.objects.values_list('content_type', 'generation'))
+            self.checked_at = now
+        return self.generations
+
+    def get(self, model, **lookup):
+        from django.contrib.contenttypes.models import ContentType
+
+        content_type_id = ContentType.objects.get_for_model(model).pk
+        key = (content_type_id, tuple(sorted(lookup.items())))
+
+        with self.lock:
+            generation = self.get_generations().get(content_type_id, 0)
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == generation:
+                self.entries.pop(key)
+                self.entries[key] = entry
+                published_model, db, field_names, values = entry[1:]
+                return published_model.from_db(db, field_names, values)
+
+        obj = model.publisher_manager.published().get(**lookup)
+        field_names = tuple(field.attname for field in obj._meta.concrete_fields)
+        values = tuple(getattr(obj, attname) for attname in field_names)
+
+        with self.lock:
+            self.entries.pop(key, None)
+            self.entries[key] = (generation, obj.__class__, obj._state.db, field_names, values)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+        return obj
+
+
+_cache = {}
+
+
+def get_instance_cache():
+    if 'cache' not in _cache:
+        _cache['cache'] = PublishedInstanceCache(**get_cache_settings())
+    return _cache['cache']
+
+
+def bump_generations(model_classes):
+    from django.contrib.contenttypes.models import ContentType
+    from .models import PublisherGeneration
+
+    for content_type in ContentType.objects.get_for_models(*model_classes).values():
+        updated = PublisherGeneration.objects.filter(content_type=content_type).update(
+            generation=models.F('generation') + 1)
+        if not updated:
+            PublisherGeneration.objects.get_or_create(
+                content_type=content_type, defaults={'generation': 1})
+
+    # This process sees its own publishes right away
+    get_instance_cache().expire()
+
+
+_generation_bumps = OnCommitBatch(bump_generations)
+
+
+def schedule_generation_bump(model):
+    """
+    Bump the generation of ``model`` once the current transaction is committed, once for all
+    the objects published within the same transaction.
+    """
+    _generation_bumps.add([model])
+
+
+def publisher_generation_changed(sender, instance, **kwargs):
+    if getattr(sender, 'publisher_cache_instances', False):
+        schedule_generation_bump(sender)
+
+
+def publisher_request_started(sender, **kwargs):
+    if 'cache' in _cache and _cache['cache'].ttl is None:
+        _cache['cache'].expire()
+
+
+publisher_post_publish.connect(publisher_generation_changed)
+publisher_post_unpublish.connect(publisher_generation_changed)
+request_started.connect(publisher_request_started)
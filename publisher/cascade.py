@@ -0,0 +1,149 @@
+from collections import OrderedDict
+
+from django.db import transaction
+from django.db.models.query import QuerySet
+
+from .bulk import bulk_publish
+from .relations import get_remote_field
+from .utils import PublisherCycleException
+
+
+def get_dependency_fields(model):
+    """
+    Return the foreign keys and many to many fields of ``model`` pointing to publisher models.
+    """
+    from .models import PublisherModelBase
+
+    fields = []
+    for field in model._meta.get_fields():
+        if not field.is_relation or field.auto_created or field.related_model is None:
+            continue
+        if not (field.many_to_one or field.one_to_one or field.many_to_many):
+            continue
+        if field.name in model.publisher_fields:
+            continue
+        if issubclass(field.related_model, PublisherModelBase):
+            fields.append(field)
+    return fields
+
+
+def get_dependencies(model, pks):
+    """
+    Return the (pk, target model, target pk) references of the objects ``pks`` of ``model``
+    to other publisher objects, with a query per relation.
+    """
+    fields = get_dependency_fields(model)
+    dependencies = []
+
+    foreign_keys = [field for field in fields if not field.many_to_many]
+    if foreign_keys:
+        rows = model._default_manager.filter(pk__in=pks).values_list(
+            'pk', *[field.attname for field in foreign_keys])
+        for row in rows:
+            for field, target_pk in zip(foreign_keys, row[1:]):
+                if target_pk is not None:
+                    dependencies.append((row[0], field.related_model, target_pk))
+
+    for field in fields:
+        if not field.many_to_many:
+            continue
+        through = get_remote_field(field).through
+        source_attname = through._meta.get_field(field.m2m_field_name()).attname
+        target_attname = through._meta.get_field(field.m2m_reverse_field_name()).attname
+        links = through._default_manager.filter(**{
+            '%s__in' % source_attname: pks,
+        }).values_list(source_attname, target_attname)
+        for pk, target_pk in links:
+            dependencies.append((pk, field.related_model, target_pk))
+
+    return dependencies
+
+
+def get_publish_order(model, pks):
+    """
+    Return the objects referenced by the objects ``pks`` of ``model``, directly or not, as
+    levels of (model, pks) which can be published once the previous levels are.
+
+    The graph is walked a model at a time, shared references are only followed once.
+    Raise ``PublisherCycleException`` if objects reference each other.
+    """
+    dependencies = {}
+    pending = OrderedDict([(model, set(pks))])
+    while pending:
+        model, pks = pending.popitem(last=False)
+        for pk in pks:
+            dependencies[(model, pk)] = set()
+        for pk, target_model, target_pk in get_dependencies(model, list(pks)):
+            target = (target_model, target_pk)
+            if target == (model, pk):
+                continue
+            dependencies[(model, pk)].add(target)
+            if target not in dependencies:
+                pending.setdefault(target_model, set()).add(target_pk)
+
+    # Objects are leveled after their deepest dependency
+    dependents = dict((node, []) for node in dependencies)
+    remaining = {}
+    for node, targets in dependencies.items():
+        remaining[node] = len(targets)
+        for target in targets:
+            dependents[target].append(node)
+
+    levels = []
+    ready = [node for node, count in remaining.items() if not count]
+    while ready:
+        level = OrderedDict()
+        next_ready = []
+        for node in ready:
+            level.setdefault(node[0], []).append(node[1])
+            for dependent in dependents[node]:
+                remaining[dependent] -= 1
+                if not remaining[dependent]:
+                    next_ready.append(dependent)
+        levels.append(list(level.items()))
+        ready = next_ready
+
+    cycle = sorted(
+        (node[0]._meta.app_label, node[0]._meta.object_name, node[1])
+        for node, count in remaining.items() if count)
+    if cycle:
+        raise PublisherCycleException('Publisher objects referencing each other: %s' % ', '.join(
+            '%s.%s %s' % node for node in cycle))
+
+    return levels
+
+
+def publish_levels(levels, exclude=()):
+    published = []
+    for level in levels:
+        for model, pks in level:
+            pks = [pk for pk in pks if (model, pk) not in exclude]
+            if pks:
+                published.extend(bulk_publish(model, model._default_manager.filter(pk__in=pks)))
+    return published
+
+
+@transaction.atomic
+def cascade_publish(model, drafts=None):
+    """
+    Publish the dirty ``drafts`` of ``model`` after the publisher objects they reference, and
+    return the published objects.
+
+    Each level of dependencies is published with a bulk publish per model.
+    """
+    if drafts is None:
+        drafts = model._default_manager.all()
+    if isinstance(drafts, QuerySet):
+        pks = list(drafts.values_list('pk', flat=True))
+    else:
+        pks = [draft.pk for draft in drafts]
+
+    return publish_levels(get_publish_order(model, pks))
+
+
+def publish_dependencies(obj):
+    """
+    Publish the dirty publisher objects referenced by ``obj``, directly or not, but not ``obj``.
+    """
+    model = obj.__class__
+    return publish_levels(get_publish_order(model, [obj.pk]), exclude=[(model, obj.pk)])
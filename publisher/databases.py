@@ -0,0 +1,64 @@
+from django.db import transaction
+
+from .relations import RelationCloner
+from .translations import get_translation_cloner
+
+
+def get_live_queryset(model):
+    """
+    Return the published copies of ``model`` stored in its ``publisher_database``.
+    """
+    return model._default_manager.using(model.publisher_database) \
+                                 .filter(publisher_is_draft=model.STATE_PUBLISHED)
+
+
+def prefetch_live_copies(model, drafts):
+    """
+    Load the published copies of ``drafts`` from the live database with a single query.
+    """
+    copies = get_live_queryset(model).in_bulk([draft.pk for draft in drafts])
+    for draft in drafts:
+        draft._publisher_live_copy = copies.get(draft.pk)
+
+
+def copy_to_database(model, drafts):
+    """
+    Write the published copies of ``drafts`` into the ``publisher_database`` of ``model``, with
+    their primary keys, translations and declared relations, and return them.
+
+    Each kind of row is written with a single bulk insert, in a transaction on the live database.
+    """
+    using = model.publisher_database
+
+    copies = []
+    for draft in drafts:
+        publish_obj = model(**dict(
+            (field.attname, getattr(draft, field.attname))
+            for field in model._meta.concrete_fields
+        ))
+        publish_obj.publisher_linked_id = None
+        publish_obj.publisher_is_draft = model.STATE_PUBLISHED
+        publish_obj.publisher_is_dirty = False
+        copies.append(publish_obj)
+
+    with transaction.atomic(using=using):
+        # The translations and relations of the previous copies are deleted along with them
+        model._default_manager.using(using).filter(pk__in=[draft.pk for draft in drafts]).delete()
+        model._default_manager.db_manager(using).bulk_create(copies)
+        for publish_obj in copies:
+            publish_obj._state.adding = False
+            publish_obj._state.db = using
+
+        pairs = list(zip(drafts, copies))
+
+        cloner = get_translation_cloner(model)
+        if cloner is not None:
+            cloner.clone(pairs, using=using)
+
+        if model.publisher_relations:
+            RelationCloner(model).clone(pairs, using=using)
+
+    for draft in drafts:
+        draft.clear_published_version_cache()
+
+    return copies
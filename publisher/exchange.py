@@ -0,0 +1,248 @@
+import json
+from collections import OrderedDict
+
+from django.apps import apps
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from .translations import get_translation_cloner
+from .utils import iter_keyset_batches
+from .versions import serialize_field
+
+EXCLUDED_FIELDS = ('publisher_linked', 'publisher_is_draft')
+
+
+def get_publisher_models(labels=None):
+    """
+    Return the publisher models of the ``app_label`` or ``app_label.ModelName`` labels, or of
+    every app.
+    """
+    from .models import PublisherModelBase
+
+    if labels:
+        models = []
+        for label in labels:
+            if '.' in label:
+                models.append(apps.get_model(label))
+            else:
+                models.extend(apps.get_app_config(label).get_models())
+    else:
+        models = apps.get_models()
+
+    return [
+        model for model in models
+        if issubclass(model, PublisherModelBase) and not model._meta.proxy
+    ]
+
+
+def get_model_label(model):
+    return '%s.%s' % (model._meta.app_label, model._meta.model_name)
+
+
+def get_exported_fields(model):
+    return [
+        field for field in model._meta.concrete_fields
+        if not field.primary_key and field.name not in EXCLUDED_FIELDS
+    ]
+
+
+def get_translation_models(model):
+    cloner = get_translation_cloner(model)
+    if cloner is None or model.publisher_split_storage:
+        return cloner, []
+    return cloner, cloner.get_translation_models(model())
+
+
+def get_translation_fields(translation_model, master_field):
+    return [
+        field for field in translation_model._meta.concrete_fields
+        if not field.primary_key and field.name != master_field
+    ]
+
+
+def get_draft_pks(model, published_pks):
+    """
+    Map the primary keys of published objects to the ones of their drafts.
+    """
+    if model.publisher_split_storage or model.publisher_database:
+        return dict((pk, pk) for pk in published_pks)
+    return dict(
+        model._default_manager.filter(publisher_linked__in=published_pks)
+                              .values_list('publisher_linked', 'pk'))
+
+
+def export_published(model, batch_size=1000):
+    """
+    Yield the published objects of ``model`` and their translations as JSON-serializable
+    dicts, reading them in primary key order, a batch at a time. The published objects without
+    a draft are skipped.
+    """
+    fields = get_exported_fields(model)
+    cloner, translation_models = get_translation_models(model)
+    queryset = model.publisher_manager.published()
+
+    for batch in iter_keyset_batches(queryset, batch_size):
+        pks = [obj.pk for obj in batch]
+
+        draft_pks = get_draft_pks(model, pks)
+
+        translations = dict((pk, []) for pk in pks)
+        for translation_model in translation_models:
+            master_attname = '%s_id' % cloner.master_field
+            translation_fields = get_translation_fields(translation_model, cloner.master_field)
+            rows = translation_model._default_manager.using(model.publisher_database).filter(**{
+                '%s__in' % master_attname: pks,
+            }).order_by('pk').iterator()
+            for translation in rows:
+                translations[getattr(translation, master_attname)].append(OrderedDict(
+                    [('model', get_model_label(translation_model))] +
+                    [(field.attname, serialize_field(field, translation))
+                     for field in translation_fields]
+                ))
+
+        for obj in batch:
+            if obj.pk not in draft_pks:
+                # Orphaned published rows, repaired by publisher_check, can't be imported
+                continue
+            yield OrderedDict([
+                ('model', get_model_label(model)),
+                ('pk', obj.pk),
+                ('draft', draft_pks[obj.pk]),
+                ('fields', OrderedDict(
+                    (field.attname, serialize_field(field, obj)) for field in fields)),
+                ('translations', translations[obj.pk]),
+            ])
+
+
+def write_published(stream, models, batch_size=1000):
+    """
+    Write the published objects of ``models`` into ``stream``, one JSON object per line, and
+    return the number of objects written.
+    """
+    count = 0
+    for model in models:
+        for data in export_published(model, batch_size):
+            stream.write(json.dumps(data) + '\n')
+            count += 1
+    return count
+
+
+def deserialize_fields(model, values):
+    obj = model()
+    for field in model._meta.concrete_fields:
+        if field.attname in values:
+            value = values[field.attname]
+            setattr(obj, field.attname, None if value is None else field.to_python(value))
+    return obj
+
+
+def import_batch(model, rows):
+    """
+    Insert a batch of exported published objects of ``model``, along with their drafts and
+    translations, with a bulk insert per table, and return the (database, model) pairs inserted
+    with explicit primary keys.
+    """
+    drafts = []
+    copies = []
+    for row in rows:
+        draft = deserialize_fields(model, row['fields'])
+        draft.pk = row['draft']
+        draft.publisher_is_draft = model.STATE_DRAFT
+        draft.publisher_is_dirty = False
+        drafts.append(draft)
+
+        if model.publisher_split_storage:
+            publish_obj = model.publisher_published_model(publisher_draft_id=draft.pk)
+            for field in get_exported_fields(model):
+                setattr(publish_obj, field.attname, getattr(draft, field.attname))
+        else:
+            publish_obj = deserialize_fields(model, row['fields'])
+            publish_obj.pk = row['pk']
+            draft.publisher_linked_id = None if model.publisher_database else row['pk']
+        publish_obj.publisher_is_draft = model.STATE_PUBLISHED
+        publish_obj.publisher_is_dirty = False
+        copies.append(publish_obj)
+
+    if model.publisher_split_storage:
+        model._default_manager.bulk_create(drafts)
+        model.publisher_published_model._default_manager.bulk_create(copies)
+        inserted = [(DEFAULT_DB_ALIAS, model), (DEFAULT_DB_ALIAS, model.publisher_published_model)]
+    elif model.publisher_database:
+        model._default_manager.bulk_create(drafts)
+        model._default_manager.db_manager(model.publisher_database).bulk_create(copies)
+        inserted = [(DEFAULT_DB_ALIAS, model), (model.publisher_database, model)]
+    else:
+        # The drafts reference their published copies
+        model._default_manager.bulk_create(copies)
+        model._default_manager.bulk_create(drafts)
+        inserted = [(DEFAULT_DB_ALIAS, model)]
+
+    cloner, translation_models = get_translation_models(model)
+    translation_models = dict(
+        (get_model_label(translation_model), translation_model)
+        for translation_model in translation_models)
+    translations = OrderedDict()
+    for row, draft, publish_obj in zip(rows, drafts, copies):
+        for values in row['translations']:
+            translation_model = translation_models[values['model']]
+            master_attname = '%s_id' % cloner.master_field
+            for master, using in ((draft, None), (publish_obj, model.publisher_database)):
+                translation = deserialize_fields(translation_model, values)
+                setattr(translation, master_attname, master.pk)
+                translations.setdefault((translation_model, using), []).append(translation)
+
+    for (translation_model, using), objs in translations.items():
+        translation_model._default_manager.db_manager(using).bulk_create(objs)
+
+    return inserted
+
+
+def reset_sequences(imported):
+    """
+    Reset the primary key sequences of the ``imported`` (database, model) pairs, as ``loaddata``
+    does, so that the objects created after an import don't reuse the imported primary keys.
+    """
+    models = {}
+    for using, model in imported:
+        models.setdefault(using, []).append(model)
+
+    for using, db_models in models.items():
+        connection = connections[using]
+        statements = connection.ops.sequence_reset_sql(no_style(), db_models)
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+
+
+def read_published(stream, batch_size=1000):
+    """
+    Import the published objects written by ``write_published()`` from ``stream``, a batch
+    at a time, and return the number of objects imported.
+    """
+    count = 0
+    model = None
+    rows = []
+    imported = set()
+    with transaction.atomic():
+        for line in stream:
+            if isinstance(line, bytes):
+                line = line.decode('utf-8')
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            row_model = apps.get_model(row['model'])
+            if rows and (row_model is not model or len(rows) >= batch_size):
+                imported.update(import_batch(model, rows))
+                count += len(rows)
+                rows = []
+            model = row_model
+            rows.append(row)
+
+        if rows:
+            imported.update(import_batch(model, rows))
+            count += len(rows)
+
+        reset_sequences(imported)
+
+    return count
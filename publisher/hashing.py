@@ -0,0 +1,73 @@
+import hashlib
+import json
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import models
+
+from .relations import get_remote_field
+from .translations import TranslationCloner
+from .versions import get_state
+
+
+def has_content_hash(model):
+    return any(field.name == 'publisher_content_hash' for field in model._meta.local_fields)
+
+
+def get_content_hash(obj):
+    """
+    Return the hash of the publishable content of ``obj``: its fields, but the ones listed in
+    ``publisher_ignore_fields``, and its translations.
+    """
+    state = get_state(obj)
+    return hashlib.sha1(json.dumps(state, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def refresh_content_hash(obj):
+    """
+    Store the hash of the current content of the draft ``obj``, and whether it is dirty.
+    """
+    content_hash = get_content_hash(obj)
+    if content_hash != obj.publisher_content_hash:
+        obj.publisher_content_hash = content_hash
+        obj.update_dirty_flag()
+        obj.__class__._default_manager.filter(pk=obj.pk).update(
+            publisher_content_hash=content_hash,
+            publisher_is_dirty=obj.publisher_is_dirty)
+
+
+def fill_content_hash(obj):
+    """
+    Store the hash of the draft ``obj`` if it was saved before adding the hash, so that it is
+    copied onto its published version.
+    """
+    if not obj.publisher_content_hash:
+        refresh_content_hash(obj)
+
+
+def publisher_translation_changed(sender, instance, **kwargs):
+    try:
+        master = getattr(instance, TranslationCloner.master_field)
+    except ObjectDoesNotExist:
+        # The master is being deleted along with its translations
+        return
+    if master is not None and master.is_draft:
+        refresh_content_hash(master)
+
+
+def publisher_hash_class_prepared(sender, **kwargs):
+    # The translations are saved after their master, so they refresh its hash themselves
+    fields = [
+        field for field in sender._meta.local_fields
+        if field.name == TranslationCloner.master_field and field.is_relation
+    ]
+    if not fields:
+        return
+    master_model = get_remote_field(fields[0]).model
+    if not isinstance(master_model, type) or not has_content_hash(master_model):
+        return
+
+    models.signals.post_save.connect(publisher_translation_changed, sender)
+    models.signals.post_delete.connect(publisher_translation_changed, sender)
+
+
+models.signals.class_prepared.connect(publisher_hash_class_prepared)
@@ -0,0 +1,189 @@
+from django.db import transaction
+
+from .cache import bump_generations
+from .databases import get_live_queryset
+from .utils import iter_keyset_batches
+
+
+class PublisherCheck(object):
+    """
+    A class of inconsistent rows of a publisher model.
+
+    The rows are found with a single query, and repaired ``batch_size`` at a time, each batch in
+    its own transaction.
+    """
+    description = None
+
+    def __init__(self, model):
+        self.model = model
+
+    @property
+    def using(self):
+        return None
+
+    def get_queryset(self):
+        raise NotImplementedError()
+
+    def count(self):
+        return self.get_queryset().count()
+
+    def iter_batches(self, batch_size):
+        queryset = self.get_queryset().values_list('pk', flat=True)
+        for pks in iter_keyset_batches(queryset, batch_size, get_key=lambda pk: pk):
+            pks = self.filter_batch(pks)
+            if pks:
+                yield pks
+
+    def filter_batch(self, pks):
+        """
+        Return the primary keys of a batch of rows of ``get_queryset()`` which are inconsistent.
+        """
+        return pks
+
+    def repair(self, pks):
+        raise NotImplementedError()
+
+    def fix(self, batch_size=1000):
+        """
+        Repair the inconsistent rows and return their number.
+        """
+        fixed = 0
+        for pks in self.iter_batches(batch_size):
+            with transaction.atomic(using=self.using):
+                self.repair(pks)
+            fixed += len(pks)
+
+        if fixed and self.model.publisher_cache_instances:
+            bump_generations([self.model])
+        return fixed
+
+
+class OrphanedPublishedCheck(PublisherCheck):
+    description = 'published row(s) without a draft'
+
+    def get_queryset(self):
+        # Left behind by deleted drafts, or by publishes which failed before linking the draft
+        return self.model._default_manager.filter(
+            publisher_is_draft=self.model.STATE_PUBLISHED, publisher_draft__isnull=True)
+
+    def repair(self, pks):
+        self.model._default_manager.filter(pk__in=pks).delete()
+
+
+class LinkedPublishedCheck(PublisherCheck):
+    description = 'published row(s) linked to another row'
+
+    def get_queryset(self):
+        return self.model._default_manager.filter(
+            publisher_is_draft=self.model.STATE_PUBLISHED, publisher_linked__isnull=False)
+
+    def repair(self, pks):
+        self.model._default_manager.filter(pk__in=pks).update(publisher_linked=None)
+
+
+class DraftLinkedToDraftCheck(PublisherCheck):
+    description = 'draft(s) linked to a draft'
+
+    def get_queryset(self):
+        return self.model._default_manager.filter(
+            publisher_is_draft=self.model.STATE_DRAFT,
+            publisher_linked__publisher_is_draft=self.model.STATE_DRAFT)
+
+    def repair(self, pks):
+        self.model._default_manager.filter(pk__in=pks).update(
+            publisher_linked=None, publisher_published_at=None, publisher_is_dirty=True)
+
+
+class UnpublishedDraftCheck(PublisherCheck):
+    description = 'unpublished draft(s) flagged as published or clean'
+
+    def get_unpublished(self):
+        return self.model._default_manager.filter(
+            publisher_is_draft=self.model.STATE_DRAFT, publisher_linked__isnull=True)
+
+    def get_queryset(self):
+        queryset = self.get_unpublished()
+        return queryset.filter(publisher_published_at__isnull=False) | \
+            queryset.filter(publisher_is_dirty=False)
+
+    def repair(self, pks):
+        self.model._default_manager.filter(pk__in=pks).update(
+            publisher_published_at=None, publisher_is_dirty=True)
+
+
+class SplitUnpublishedDraftCheck(UnpublishedDraftCheck):
+
+    def get_unpublished(self):
+        published_pks = self.model.publisher_published_model._default_manager.values('pk')
+        return self.model._default_manager.exclude(pk__in=published_pks)
+
+
+class SplitOrphanedPublishedCheck(PublisherCheck):
+    description = 'published row(s) without a draft'
+
+    def get_queryset(self):
+        draft_pks = self.model._default_manager.values('pk')
+        return self.model.publisher_published_model._default_manager.exclude(pk__in=draft_pks)
+
+    def repair(self, pks):
+        self.model.publisher_published_model._default_manager.filter(pk__in=pks).delete()
+
+
+class CrossDatabaseCheckMixin(object):
+    """
+    The live copies and the drafts are in different databases and can't be joined: the rows
+    are read ``batch_size`` at a time, and looked up in the other database.
+    """
+
+    def count(self, batch_size=1000):
+        return sum(len(pks) for pks in self.iter_batches(batch_size))
+
+
+class LiveOrphanedPublishedCheck(CrossDatabaseCheckMixin, PublisherCheck):
+    description = 'published row(s) without a draft'
+
+    @property
+    def using(self):
+        return self.model.publisher_database
+
+    def get_queryset(self):
+        return get_live_queryset(self.model)
+
+    def filter_batch(self, pks):
+        draft_pks = set(self.model._default_manager.filter(
+            pk__in=pks, publisher_is_draft=self.model.STATE_DRAFT,
+        ).values_list('pk', flat=True))
+        return [pk for pk in pks if pk not in draft_pks]
+
+    def repair(self, pks):
+        get_live_queryset(self.model).filter(pk__in=pks).delete()
+
+
+class LiveUnpublishedDraftCheck(CrossDatabaseCheckMixin, UnpublishedDraftCheck):
+
+    def get_unpublished(self):
+        # Narrowed down to the drafts without a live copy by filter_batch()
+        return self.model._default_manager.filter(publisher_is_draft=self.model.STATE_DRAFT)
+
+    def filter_batch(self, pks):
+        live_pks = set(get_live_queryset(self.model).filter(pk__in=pks)
+                                                    .values_list('pk', flat=True))
+        return [pk for pk in pks if pk not in live_pks]
+
+
+def get_checks(model):
+    """
+    Return the checks applying to the storage mode of ``model``.
+    """
+    if model.publisher_split_storage:
+        classes = (SplitOrphanedPublishedCheck, SplitUnpublishedDraftCheck)
+    elif model.publisher_database:
+        classes = (LiveOrphanedPublishedCheck, LiveUnpublishedDraftCheck)
+    else:
+        classes = (
+            OrphanedPublishedCheck,
+            LinkedPublishedCheck,
+            DraftLinkedToDraftCheck,
+            UnpublishedDraftCheck,
+        )
+    return [check_class(model) for check_class in classes]
@@ -1,27 +1,28 @@
 import sys
 
 from django.core.management.base import BaseCommand
-from optparse import make_option
 
+from publisher.status import get_unpublished_filter
 
-class Command(BaseCommand):
-    option_list = BaseCommand.option_list + (
-        make_option('--list', action='store_true', dest='show_list', default=False,
-                    help='List model items waiting to be published (limited to 100)'),
-    )
 
-    args = '[modelname] [pk] [--list]'
+class Command(BaseCommand):
     help = 'Publish a specific model or models within app'
     usage_str = 'Usage: ./manage.py publish_model app.models.Blog'
 
+    def add_arguments(self, parser):
+        parser.add_argument('model_name', nargs='?', default=None)
+        parser.add_argument('pk', nargs='?', default=None)
+        parser.add_argument('--list', action='store_true', dest='show_list', default=False,
+                            help='List model items waiting to be published (limited to 100)')
+
     def error(self, message, code=1):
         """
         Print error and stop command
         """
-        print >>sys.stderr, message
+        self.stderr.write(message)
         sys.exit(code)
 
-    def handle(self, model_name=None, pk=None, show_list=None, *args, **options):
+    def handle(self, model_name=None, pk=None, show_list=False, *args, **options):
         if not model_name:
             self.error('You must provide an app to publish.\n' + self.usage_str)
 
@@ -29,17 +30,22 @@ class Command(BaseCommand):
 
         # TODO: Validate model is a publisher instance
 
-        qs = module.objects.filter(publisher_is_draft=True).filter(publisher_linked_id=None)
+        qs = module.objects.filter(publisher_is_draft=True).filter(get_unpublished_filter(module))
 
         if pk:
             qs = qs.filter(pk=pk)
 
+        if show_list:
+            for model in qs.order_by('pk')[:100]:
+                self.stdout.write('%s %s' % (model.pk, model))
+            return
+
         if qs.count() < 1:
             self.error('No model(s) found to publish')
 
         for model in qs.all():
             model.publish()
-            print 'Successfully published %s' % model
+            self.stdout.write('Successfully published %s' % model)
 
     def get_model(self, model_name):
         """
@@ -50,7 +56,7 @@ class Command(BaseCommand):
             module_name, class_name = model_name.rsplit('.', 1)
             mod = __import__(module_name, fromlist=[class_name])
             klass = getattr(mod, class_name)
-        except ImportError, e:
+        except ImportError as e:
             self.error('Cannot find app %s %s' % (model_name, e))
 
         return klass
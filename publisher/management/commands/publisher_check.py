@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from publisher.exchange import get_model_label, get_publisher_models
+from publisher.integrity import get_checks
+
+
+class Command(BaseCommand):
+    help = 'Find, and optionally repair, the inconsistent rows of the publisher models'
+
+    def add_arguments(self, parser):
+        parser.add_argument('label', nargs='*',
+                            help='app_label or app_label.ModelName to check (default: all)')
+        parser.add_argument('--fix', action='store_true', dest='fix', default=False,
+                            help='Repair the inconsistent rows')
+        parser.add_argument('--batch-size', type=int, dest='batch_size', default=1000,
+                            help='Number of rows repaired per transaction')
+
+    def handle(self, *args, **options):
+        found = 0
+        for model in get_publisher_models(options['label']):
+            for check in get_checks(model):
+                if options['fix']:
+                    count = check.fix(options['batch_size'])
+                else:
+                    count = check.count()
+                if count:
+                    found += count
+                    self.stdout.write('%s: %d %s%s' % (
+                        get_model_label(model), count, check.description,
+                        ' repaired' if options['fix'] else ''))
+
+        if not found:
+            self.stdout.write('No inconsistencies found.')
+        elif options['fix']:
+            self.stdout.write('Repaired %d row(s).' % found)
+        else:
+            self.stdout.write(
+                'Found %d inconsistent row(s), run with --fix to repair them.' % found)
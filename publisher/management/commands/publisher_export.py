@@ -0,0 +1,34 @@
+import codecs
+import gzip
+
+from django.core.management.base import BaseCommand
+
+from publisher.exchange import get_publisher_models, write_published
+
+
+class Command(BaseCommand):
+    help = 'Stream the published objects and their translations as JSON lines'
+
+    def add_arguments(self, parser):
+        parser.add_argument('label', nargs='*',
+                            help='app_label or app_label.ModelName to export (default: all)')
+        parser.add_argument('--output', '-o', dest='output', default=None,
+                            help='File to write, compressed if it ends with .gz (default: stdout)')
+        parser.add_argument('--batch-size', type=int, dest='batch_size', default=1000,
+                            help='Number of objects read per query')
+
+    def handle(self, *args, **options):
+        models = get_publisher_models(options['label'])
+        output = options['output']
+
+        if output is None:
+            count = write_published(self.stdout, models, options['batch_size'])
+        else:
+            if output.endswith('.gz'):
+                stream = codecs.getwriter('utf-8')(gzip.open(output, 'wb'))
+            else:
+                stream = codecs.open(output, 'w', encoding='utf-8')
+            with stream:
+                count = write_published(stream, models, options['batch_size'])
+
+        self.stderr.write('Exported %d object(s).' % count)
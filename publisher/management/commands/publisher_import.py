@@ -0,0 +1,31 @@
+import gzip
+import sys
+
+from django.core.management.base import BaseCommand
+
+from publisher.exchange import read_published
+
+
+class Command(BaseCommand):
+    help = 'Import the published objects written by publisher_export, along with their drafts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('input',
+                            help='File to read, decompressed if it ends with .gz, or - for stdin')
+        parser.add_argument('--batch-size', type=int, dest='batch_size', default=1000,
+                            help='Number of objects inserted per query')
+
+    def handle(self, *args, **options):
+        path = options['input']
+
+        if path == '-':
+            count = read_published(sys.stdin, options['batch_size'])
+        else:
+            if path.endswith('.gz'):
+                stream = gzip.open(path, 'rb')
+            else:
+                stream = open(path, 'rb')
+            with stream:
+                count = read_published(stream, options['batch_size'])
+
+        self.stdout.write('Imported %d object(s).' % count)
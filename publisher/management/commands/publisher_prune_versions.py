@@ -0,0 +1,41 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from publisher.models import PublisherVersion
+from publisher.versions import get_version_retention, prune_versions
+
+
+class Command(BaseCommand):
+    help = 'Compact the published version history according to the retention settings'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keep', type=int, dest='keep', default=None,
+                            help='Number of versions kept per object')
+        parser.add_argument('--max-age', type=int, dest='max_age', default=None,
+                            help='Maximum age of the versions kept, in days')
+
+    def handle(self, *args, **options):
+        keep, max_age = get_version_retention()
+        if options['keep'] is not None:
+            keep = options['keep']
+        if options['max_age'] is not None:
+            max_age = timedelta(days=options['max_age'])
+
+        if keep is None and max_age is None:
+            self.stderr.write('No retention configured, nothing to prune.')
+            return
+
+        objects = PublisherVersion.objects.order_by() \
+                                          .values('content_type', 'object_id') \
+                                          .annotate(count=Count('pk')) \
+                                          .filter(count__gt=1)
+
+        deleted = 0
+        for row in objects.iterator():
+            versions = PublisherVersion.objects.filter(
+                content_type=row['content_type'], object_id=row['object_id'])
+            deleted += prune_versions(versions, keep=keep, max_age=max_age)
+
+        self.stdout.write('Deleted %d version(s).' % deleted)
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from publisher.autopublish import publish_pending
+
+
+class Command(BaseCommand):
+    help = 'Publish the auto-published drafts which have not been saved for the debounce delay'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, dest='batch_size', default=1000,
+                            help='Number of drafts published per transaction')
+        parser.add_argument('--interval', type=float, dest='interval', default=None,
+                            help='Keep running, checking for due drafts every INTERVAL seconds')
+
+    def handle(self, *args, **options):
+        while True:
+            published = publish_pending(batch_size=options['batch_size'])
+            if published or options['interval'] is None:
+                self.stdout.write('Published %d object(s).' % published)
+            if options['interval'] is None:
+                return
+            close_old_connections()
+            time.sleep(options['interval'])
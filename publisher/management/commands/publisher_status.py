@@ -0,0 +1,32 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from publisher.exchange import get_publisher_models
+from publisher.status import get_status
+
+COLUMNS = ('drafts', 'published', 'unpublished', 'dirty', 'scheduled')
+
+
+class Command(BaseCommand):
+    help = 'Report the number of drafts published, unpublished, dirty or scheduled per model'
+
+    def add_arguments(self, parser):
+        parser.add_argument('label', nargs='*',
+                            help='app_label or app_label.ModelName to report (default: all)')
+        parser.add_argument('--json', action='store_true', dest='json', default=False,
+                            help='Output the counts as JSON')
+
+    def handle(self, *args, **options):
+        status = get_status(get_publisher_models(options['label']))
+
+        if options['json']:
+            self.stdout.write(json.dumps(status, indent=2))
+            return
+
+        width = max([len('model')] + [len(label) for label in status])
+        self.stdout.write('  '.join(
+            ['model'.ljust(width)] + [column.rjust(11) for column in COLUMNS]))
+        for label, counts in status.items():
+            self.stdout.write('  '.join(
+                [label.ljust(width)] + [str(counts[column]).rjust(11) for column in COLUMNS]))
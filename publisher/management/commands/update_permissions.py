@@ -1,20 +1,76 @@
+from collections import OrderedDict
+
+from django.apps import apps
+from django.contrib.auth.models import Permission
+from django.contrib.contenttypes.models import ContentType
 from django.core.management.base import BaseCommand
-from django.db.models import get_models, get_app
-from django.contrib.auth.management import create_permissions
+from django.db import DEFAULT_DB_ALIAS
+
+
+def get_model_permissions(opts):
+    """
+    Return the (codename, name) permissions of a model, as created by django.contrib.auth.
+    """
+    permissions = [
+        ('%s_%s' % (action, opts.model_name), 'Can %s %s' % (action, opts.verbose_name_raw))
+        for action in opts.default_permissions
+    ]
+    permissions.extend(opts.permissions)
+    return permissions
 
 
 class Command(BaseCommand):
-    args = '<app app ...>'
     help = 'reloads permissions for specified apps, or all apps if no args are specified'
 
+    def add_arguments(self, parser):
+        parser.add_argument('app_label', nargs='*',
+                            help='Apps to reload the permissions of (default: all apps)')
+        parser.add_argument('--database', dest='database', default=DEFAULT_DB_ALIAS,
+                            help='Database to update the permissions in')
+
     def handle(self, *args, **options):
-        if not args:
-            apps = []
-            for model in get_models():
-                apps.append(get_app(model._meta.app_label))
+        app_labels = options['app_label']
+        if app_labels:
+            app_configs = [apps.get_app_config(app_label) for app_label in app_labels]
         else:
-            apps = []
-            for arg in args:
-                apps.append(get_app(arg))
-        for app in apps:
-            create_permissions(app, get_models(), int(options.get('verbosity', 0)))
+            app_configs = apps.get_app_configs()
+
+        # Each model is only handled once, even if its app is listed twice
+        models = OrderedDict()
+        for app_config in app_configs:
+            for model in app_config.get_models():
+                models[model] = True
+
+        created = self.sync_permissions(list(models), options['database'])
+
+        verbosity = int(options.get('verbosity', 1))
+        if verbosity >= 2:
+            for permission in created:
+                self.stdout.write('Adding permission %s.%s' % (
+                    permission.content_type.app_label, permission.codename))
+        if verbosity >= 1:
+            self.stdout.write('%d permission(s) added for %d model(s).' % (
+                len(created), len(models)))
+
+    def sync_permissions(self, models, using):
+        """
+        Create the missing permissions of ``models``, and return them.
+        """
+        ctypes = ContentType.objects.db_manager(using).get_for_models(*models)
+
+        existing = set(
+            Permission.objects.using(using)
+                              .filter(content_type__in=set(ctypes.values()))
+                              .order_by()
+                              .values_list('content_type', 'codename'))
+
+        missing = OrderedDict()
+        for model, ctype in ctypes.items():
+            for codename, name in get_model_permissions(model._meta):
+                if (ctype.pk, codename) not in existing:
+                    missing[(ctype.pk, codename)] = Permission(
+                        codename=codename, name=name, content_type=ctype)
+
+        permissions = list(missing.values())
+        Permission.objects.using(using).bulk_create(permissions)
+        return permissions
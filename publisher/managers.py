@@ -1,5 +1,6 @@
 from django.db import models
 
+from .aio import run_in_executor
 from .signals import publisher_pre_delete
 from .middleware import get_draft_status
 
@@ -16,9 +17,97 @@ class PublisherManager(models.Manager):
 
     def published(self):
         from .models import PublisherModelBase
+        if self.model.publisher_split_storage:
+            return self.model.publisher_published_model._default_manager.using(self._db)
+        if self.model.publisher_database:
+            from .databases import get_live_queryset
+            return get_live_queryset(self.model)
         return self.filter(publisher_is_draft=PublisherModelBase.STATE_PUBLISHED)
 
-    def current(self):
-        if get_draft_status():
+    def dirty(self):
+        """
+        Return the drafts which are not published or differ from their published version.
+
+        Unlike ``is_dirty``, the changes of the placeholders are not taken into account.
+        """
+        from .hashing import has_content_hash
+        if self.model.publisher_database:
+            # The published versions can't be joined from another database
+            return self.needs_publishing()
+        if self.model.publisher_split_storage:
+            published = 'publisher_published'
+        else:
+            published = 'publisher_linked'
+
+        if has_content_hash(self.model):
+            # The drafts saved before adding the hash have none, and are dirty
+            changed = ~models.Q(publisher_content_hash=models.F(
+                '%s__publisher_content_hash' % published)) | models.Q(publisher_content_hash='')
+        else:
+            changed = models.Q(publisher_modified_at__gt=models.F(
+                '%s__publisher_modified_at' % published))
+
+        return self.drafts().filter(models.Q(**{'%s__isnull' % published: True}) | changed)
+
+    def abulk_publish(self, drafts=None, cascade=False):
+        """
+        Awaitable version of ``bulk_publish()``, run in the publisher thread pool.
+        """
+        return run_in_executor(self.bulk_publish, drafts, cascade=cascade)
+
+    def abulk_unpublish(self, drafts=None):
+        """
+        Awaitable version of ``bulk_unpublish()``, run in the publisher thread pool.
+        """
+        return run_in_executor(self.bulk_unpublish, drafts)
+
+    def needs_publishing(self):
+        """
+        Return the drafts flagged with unpublished changes, using the ``publisher_is_dirty`` index.
+        """
+        return self.drafts().filter(publisher_is_dirty=True)
+
+    def refresh_dirty_flags(self):
+        """
+        Recompute the ``publisher_is_dirty`` flag of every draft, e.g. after adding the field.
+        """
+        self.drafts().update(publisher_is_dirty=False)
+        self.dirty().update(publisher_is_dirty=True)
+
+    def get_cached(self, **lookup):
+        """
+        Return the published object matching ``lookup``, from the in-process cache if the model
+        sets ``publisher_cache_instances``.
+        """
+        from .cache import get_instance_cache
+        if not self.model.publisher_cache_instances:
+            return self.published().get(**lookup)
+        return get_instance_cache().get(self.model, **lookup)
+
+    def current(self, request=None):
+        if get_draft_status(request):
             return self.drafts()
         return self.published()
+
+    def bulk_publish(self, drafts=None, cascade=False):
+        """
+        Publish the dirty drafts (all of them by default) with bulk queries.
+
+        With ``cascade``, the publisher objects referenced by the drafts are published first.
+        """
+        from .bulk import bulk_publish
+        from .cascade import cascade_publish
+        if drafts is None:
+            drafts = self.drafts()
+        if cascade:
+            return cascade_publish(self.model, drafts)
+        return bulk_publish(self.model, drafts)
+
+    def bulk_unpublish(self, drafts=None):
+        """
+        Unpublish the drafts (all of them by default) with bulk queries.
+        """
+        from .bulk import bulk_unpublish
+        if drafts is None:
+            drafts = self.drafts()
+        return bulk_unpublish(self.model, drafts)
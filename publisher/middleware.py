@@ -1,33 +1,127 @@
 from threading import current_thread
 
+from django.conf import settings
+from django.core import signing
+from django.utils.cache import patch_cache_control
+
+PREVIEW_TOKEN_SALT = 'publisher.preview'
+
+
+def get_preview_settings():
+    return {
+        'param': getattr(settings, 'PUBLISHER_PREVIEW_PARAM', 'preview'),
+        'cookie': getattr(settings, 'PUBLISHER_PREVIEW_COOKIE', 'publisher_preview'),
+        'max_age': getattr(settings, 'PUBLISHER_PREVIEW_TOKEN_MAX_AGE', 60 * 60),
+    }
+
+
+def get_preview_token(user):
+    """
+    Return a signed token allowing ``user`` to preview drafts until it expires.
+    """
+    return signing.dumps({'user': user.pk}, salt=PREVIEW_TOKEN_SALT, compress=True)
+
+
+def check_preview_token(token):
+    """
+    Check the signature and the age of a preview token, without any database access.
+    """
+    try:
+        signing.loads(token, salt=PREVIEW_TOKEN_SALT, max_age=get_preview_settings()['max_age'])
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def get_preview_url(url, user):
+    preview_settings = get_preview_settings()
+    separator = '&' if '?' in url else '?'
+    return '%s%s%s=%s' % (url, separator, preview_settings['param'], get_preview_token(user))
+
 
 class PublisherMiddleware(object):
     _draft_status = {}
 
+    @staticmethod
+    def get_preview_token(request):
+        preview_settings = get_preview_settings()
+        token = request.GET.get(preview_settings['param'])
+        if token:
+            return token
+        return getattr(request, 'COOKIES', {}).get(preview_settings['cookie'])
+
     @staticmethod
     def is_draft(request):
-        authenticated = request.user.is_authenticated() and request.user.is_staff
-        is_draft = 'edit' in request.GET and authenticated
-        return is_draft
+        token = PublisherMiddleware.get_preview_token(request)
+        if token:
+            return check_preview_token(token)
+
+        # Only the legacy "?edit" preview looks at the user, leaving the session untouched
+        # for the public traffic.
+        if 'edit' not in request.GET:
+            return False
+        return request.user.is_authenticated() and request.user.is_staff
 
     def process_request(self, request):
-        PublisherMiddleware._draft_status[current_thread()] = self.is_draft(request)
+        is_draft = self.is_draft(request)
+        PublisherMiddleware._draft_status[current_thread()] = is_draft
+        if request is not None:
+            # Unlike the thread status, the request follows the view into any thread
+            request.publisher_is_draft = is_draft
 
     @staticmethod
     def process_response(request, response):
-        try:
-            del PublisherMiddleware._draft_status[current_thread()]
-        except KeyError:
-            pass
+        is_draft = PublisherMiddleware._draft_status.pop(current_thread(), None)
+        is_draft = getattr(request, 'publisher_is_draft', is_draft)
+        if is_draft is None:
+            return response
+
+        if response is not None:
+            PublisherMiddleware.patch_response(request, response, is_draft)
+
         return response
 
     @staticmethod
-    def get_draft_status():
+    def patch_response(request, response, is_draft):
+        if is_draft:
+            # Drafts must never be stored by a shared cache
+            patch_cache_control(response, private=True, no_store=True)
+
+            # Keep previewing while following links from a page opened with a preview token
+            preview_settings = get_preview_settings()
+            token = getattr(request, 'GET', {}).get(preview_settings['param'])
+            if token:
+                response.set_cookie(
+                    preview_settings['cookie'],
+                    token,
+                    max_age=preview_settings['max_age'],
+                    httponly=True)
+            return
+
+        # Only the responses rendered by the publisher views are made cacheable
+        keys = getattr(request, 'publisher_surrogate_keys', None)
+        if not keys:
+            return
+
+        header = getattr(settings, 'PUBLISHER_SURROGATE_KEY_HEADER', 'Surrogate-Key')
+        response[header] = ' '.join(sorted(keys))
+
+        max_age = getattr(settings, 'PUBLISHER_CACHE_MAX_AGE', None)
+        if max_age is not None and not response.has_header('Cache-Control'):
+            patch_cache_control(response, public=True, max_age=max_age)
+
+    @staticmethod
+    def get_draft_status(request=None):
+        if request is not None and hasattr(request, 'publisher_is_draft'):
+            return request.publisher_is_draft
         try:
             return PublisherMiddleware._draft_status[current_thread()]
         except KeyError:
             return False
 
 
-def get_draft_status():
-    return PublisherMiddleware.get_draft_status()
+def get_draft_status(request=None):
+    """
+    Return whether drafts are shown, for ``request`` if given, else for the current thread.
+    """
+    return PublisherMiddleware.get_draft_status(request)
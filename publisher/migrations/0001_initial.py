@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-18 22:06
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PublisherVersion',
+            fields=[
+                ('id', models.AutoField(
+                    auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField()),
+                ('version', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(
+                    db_index=True, default=django.utils.timezone.now)),
+                ('is_snapshot', models.BooleanField(default=False)),
+                ('delta', models.BinaryField()),
+                ('content_type', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE, to='contenttypes.ContentType')),
+            ],
+            options={
+                'ordering': ('version',),
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='publisherversion',
+            unique_together=set([('content_type', 'object_id', 'version')]),
+        ),
+    ]
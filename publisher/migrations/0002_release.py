@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-18 22:16
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('publisher', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Release',
+            fields=[
+                ('id', models.AutoField(
+                    auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('published_at', models.DateTimeField(editable=False, null=True)),
+                ('publish_duration', models.FloatField(editable=False, null=True)),
+            ],
+            options={
+                'ordering': ('-created_at',),
+            },
+        ),
+        migrations.CreateModel(
+            name='ReleaseItem',
+            fields=[
+                ('id', models.AutoField(
+                    auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField()),
+                ('content_type', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE, to='contenttypes.ContentType')),
+                ('release', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE, related_name='items',
+                    to='publisher.Release')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='releaseitem',
+            unique_together=set([('release', 'content_type', 'object_id')]),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.29 on 2026-10-18 22:29
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('publisher', '0002_release'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PublisherGeneration',
+            fields=[
+                ('id', models.AutoField(
+                    auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('generation', models.PositiveIntegerField(default=0)),
+                ('content_type', models.OneToOneField(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    to='contenttypes.ContentType')),
+            ],
+        ),
+    ]
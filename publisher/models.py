@@ -1,9 +1,23 @@
+import time
+from collections import OrderedDict
+
 from django.utils import timezone
-from django.db import models
+from django.utils.encoding import python_2_unicode_compatible
+from django.db import models, transaction
 from django.core.exceptions import ObjectDoesNotExist
 
+from .aio import run_in_executor
+from .databases import copy_to_database, get_live_queryset
 from .managers import PublisherManager
-from .utils import assert_draft
+from .utils import assert_draft, chunk_plugins, PublisherConflictException
+from .storage import publisher_class_prepared  # noqa
+from .purgers import publisher_pre_change, publisher_post_change  # noqa
+from .hashing import fill_content_hash, get_content_hash, publisher_hash_class_prepared  # noqa
+from .cache import publisher_generation_changed  # noqa
+from .autopublish import schedule_auto_publish
+from .relations import get_relation_cloner
+from .translations import get_translation_cloner
+from .versions import build_state, decompress_delta, get_versions, record_version, restore_state
 from .signals import (
     publisher_publish_pre_save_draft,
     publisher_pre_publish,
@@ -32,12 +46,17 @@ class PublisherModelBase(models.Model):
         editable=False)
 
     publisher_published_at = models.DateTimeField(null=True, editable=False)
+    publisher_is_dirty = models.BooleanField(
+        default=True,
+        editable=False,
+        db_index=True)
 
     publisher_fields = (
         'publisher_linked',
         'publisher_is_draft',
         'publisher_modified_at',
         'publisher_draft',
+        'publisher_is_dirty',
     )
     publisher_ignore_fields = publisher_fields + (
         'pk',
@@ -49,6 +68,43 @@ class PublisherModelBase(models.Model):
         'id',
     )
 
+    # Keep the published copies in a generated "<db_table>_published" table
+    publisher_split_storage = False
+    # Extra Meta options (indexes, ordering...) for the generated published model
+    publisher_published_meta = {}
+    # Methods copied onto the generated published model
+    publisher_published_methods = (
+        '__str__',
+        '__unicode__',
+        'get_absolute_url',
+    )
+    publisher_published_model = None
+
+    # Alias of the database receiving the published copies, instead of the drafts table
+    publisher_database = None
+
+    # Keep the published instances fetched with publisher_manager.get_cached() in memory
+    publisher_cache_instances = False
+
+    # Many to many fields and reverse foreign keys copied onto the published copies
+    publisher_relations = ()
+    # Many to many fields of publisher_relations linked to the published versions of their targets
+    publisher_relations_remap = ()
+
+    # Publish the drafts when they haven't been saved for PUBLISHER_AUTO_PUBLISH_DELAY seconds
+    publisher_auto_publish = False
+
+    # Keep a compressed delta of every published state, see rollback_to()
+    publisher_versioning = False
+
+    # Number of placeholder plugins copied at once when publishing
+    publisher_plugin_chunk_size = 500
+
+    # Concurrent publishing of a draft: None, 'lock' (select_for_update) or 'optimistic'
+    publisher_concurrency = None
+    # Number of retries of an optimistic publish conflicting with another one
+    publisher_publish_retries = 3
+
     class Meta:
         abstract = True
 
@@ -65,27 +121,129 @@ class PublisherModelBase(models.Model):
         if not self.is_draft:
             return False
 
+        published_obj = self.get_published_version()
+
         # If the record has not been published assume dirty
-        if not self.publisher_linked:
+        if not published_obj:
             return True
 
-        if self.publisher_modified_at > self.publisher_linked.publisher_modified_at:
+        if self.is_content_changed(published_obj):
             return True
 
         # Get all placeholders + their plugins to find their modified date
         for placeholder_field in self.get_placeholder_fields():
             placeholder = getattr(self, placeholder_field)
             for plugin in placeholder.get_plugins_list():
-                if plugin.changed_date > self.publisher_linked.publisher_modified_at:
+                if plugin.changed_date > published_obj.publisher_modified_at:
                     return True
 
         return False
 
+    def is_content_changed(self, published_obj):
+        return self.publisher_modified_at > published_obj.publisher_modified_at
+
+    def get_published_version(self):
+        """
+        Return the published copy of this draft, or None if it is not published.
+        """
+        if not self.is_draft:
+            return None
+
+        if self.publisher_split_storage:
+            if self.pk is None:
+                return None
+            try:
+                return self.publisher_published
+            except ObjectDoesNotExist:
+                return None
+
+        if self.publisher_database:
+            if self.pk is None:
+                return None
+            if '_publisher_live_copy' not in self.__dict__:
+                self._publisher_live_copy = get_live_queryset(self.__class__).filter(
+                    pk=self.pk).first()
+            return self._publisher_live_copy
+
+        return self.publisher_linked
+
+    def clear_published_version_cache(self):
+        self.__dict__.pop('_publisher_live_copy', None)
+        if self.publisher_split_storage:
+            cache_name = self._meta.get_field('publisher_published').get_cache_name()
+            self.__dict__.pop(cache_name, None)
+
     @assert_draft
-    def publish(self):
+    def publish(self, cascade=False):
         if not self.is_draft:
             return
 
+        if cascade:
+            # Publish the publisher objects referenced by the draft first
+            from .cascade import publish_dependencies
+            with transaction.atomic():
+                publish_dependencies(self)
+                self.publish()
+            return
+
+        if self.publisher_concurrency == 'lock':
+            with transaction.atomic():
+                self.lock_draft()
+                self.publish_draft()
+        elif self.publisher_concurrency == 'optimistic':
+            self.publish_optimistic()
+        else:
+            self.publish_draft()
+
+    def lock_draft(self):
+        """
+        Lock the draft row until the end of the transaction and reload its publishing state.
+        """
+        list(self.__class__._default_manager.select_for_update()
+                                            .filter(pk=self.pk)
+                                            .values_list('pk', flat=True))
+        self.refresh_from_db(fields=[
+            'publisher_linked',
+            'publisher_modified_at',
+            'publisher_published_at',
+        ])
+        self.clear_published_version_cache()
+
+    def claim_draft(self):
+        """
+        Check the draft has not been modified or published since it was loaded.
+        """
+        lookup = {
+            'pk': self.pk,
+            'publisher_linked': self.publisher_linked_id,
+            'publisher_modified_at': self.publisher_modified_at,
+        }
+        if self.publisher_split_storage or self.publisher_database:
+            # The drafts aren't linked to their published copies, publishing only updates these
+            lookup.update(
+                publisher_published_at=self.publisher_published_at,
+                publisher_is_dirty=self.publisher_is_dirty)
+
+        claimed = self.__class__._default_manager.filter(**lookup).update(
+            publisher_modified_at=models.F('publisher_modified_at'))
+
+        if not claimed:
+            raise PublisherConflictException()
+
+    def publish_optimistic(self):
+        for attempt in range(self.publisher_publish_retries + 1):
+            try:
+                with transaction.atomic():
+                    self.claim_draft()
+                    self.publish_draft()
+                return
+            except PublisherConflictException:
+                if attempt == self.publisher_publish_retries:
+                    raise
+                self.refresh_from_db()
+                self.clear_published_version_cache()
+
+    def publish_draft(self):
         if not self.is_dirty:
             return
 
@@ -94,6 +252,14 @@ class PublisherModelBase(models.Model):
         # Reference self for readability
         draft_obj = self
 
+        if draft_obj.publisher_split_storage:
+            self.publish_split(draft_obj)
+            return
+
+        if draft_obj.publisher_database:
+            self.publish_to_database(draft_obj)
+            return
+
         # Set the published date if this is the first time the page has been published
         if not draft_obj.publisher_linked:
             draft_obj.publisher_published_at = timezone.now()
@@ -112,6 +278,7 @@ class PublisherModelBase(models.Model):
         for fld in self.publisher_publish_empty_fields:
             setattr(publish_obj, fld, None)
         publish_obj.publisher_is_draft = self.STATE_PUBLISHED
+        publish_obj.publisher_is_dirty = False
         publish_obj.publisher_published_at = draft_obj.publisher_published_at
 
         # Link the published obj to the draft version
@@ -125,15 +292,71 @@ class PublisherModelBase(models.Model):
         self.clone_placeholder(draft_obj, publish_obj)
 
         # Clone relationships
+        self.clone_publisher_relations(draft_obj, publish_obj)
         self.clone_relations(draft_obj, publish_obj)
 
         # Link the draft obj to the current published version
         draft_obj.publisher_linked = publish_obj
+        draft_obj.publisher_is_dirty = False
 
         publisher_publish_pre_save_draft.send(sender=draft_obj.__class__, instance=draft_obj)
 
         draft_obj.save(suppress_modified=True)
 
+        if draft_obj.publisher_versioning:
+            record_version(draft_obj)
+
+        publisher_post_publish.send(sender=draft_obj.__class__, instance=draft_obj)
+
+    def publish_split(self, draft_obj):
+        published_model = self.publisher_published_model
+        published_qs = published_model._default_manager.filter(pk=draft_obj.pk)
+
+        if not published_qs.exists():
+            draft_obj.publisher_published_at = timezone.now()
+
+        # Remove the current published record
+        published_qs.delete()
+        draft_obj.clear_published_version_cache()
+
+        # Copy the draft into the published table, sharing its primary key
+        publish_obj = published_model(publisher_draft=draft_obj)
+        for field in published_model._meta.local_fields:
+            if not field.primary_key:
+                setattr(publish_obj, field.attname, getattr(draft_obj, field.attname))
+        publish_obj.publisher_is_draft = self.STATE_PUBLISHED
+        publish_obj.publisher_is_dirty = False
+        publish_obj.save(force_insert=True)
+
+        self.clone_placeholder(draft_obj, publish_obj)
+        self.clone_relations(draft_obj, publish_obj)
+        draft_obj.publisher_is_dirty = False
+
+        publisher_publish_pre_save_draft.send(sender=draft_obj.__class__, instance=draft_obj)
+
+        draft_obj.save(suppress_modified=True)
+
+        if draft_obj.publisher_versioning:
+            record_version(draft_obj)
+
+        publisher_post_publish.send(sender=draft_obj.__class__, instance=draft_obj)
+
+    def publish_to_database(self, draft_obj):
+        if draft_obj.get_published_version() is None:
+            draft_obj.publisher_published_at = timezone.now()
+
+        # Placeholders can only be copied within the default database
+        publish_obj, = copy_to_database(self.__class__, [draft_obj])
+        self.clone_relations(draft_obj, publish_obj)
+        draft_obj.publisher_is_dirty = False
+
+        publisher_publish_pre_save_draft.send(sender=draft_obj.__class__, instance=draft_obj)
+
+        draft_obj.save(suppress_modified=True)
+
+        if draft_obj.publisher_versioning:
+            record_version(draft_obj)
+
         publisher_post_publish.send(sender=draft_obj.__class__, instance=draft_obj)
 
     @assert_draft
@@ -155,11 +378,13 @@ class PublisherModelBase(models.Model):
 
     @assert_draft
     def unpublish(self):
-        if not self.is_draft or not self.publisher_linked:
+        published_obj = self.get_published_version()
+        if not self.is_draft or not published_obj:
             return
 
         publisher_pre_unpublish.send(sender=self.__class__, instance=self)
-        self.publisher_linked.delete()
+        published_obj.delete()
+        self.clear_published_version_cache()
         self.publisher_linked = None
         self.publisher_published_at = None
         self.save()
@@ -173,6 +398,9 @@ class PublisherModelBase(models.Model):
         @toavoid self.__class__ = draft_obj.__class__
         @toavoid self.__dict__ = draft_obj.__dict__
         """
+        if self.publisher_split_storage or self.publisher_database:
+            return self.revert_split()
+
         if not self.publisher_linked:
             return
 
@@ -194,6 +422,54 @@ class PublisherModelBase(models.Model):
 
         return draft_obj
 
+    def revert_split(self):
+        # The draft keeps its primary key, only its values are reverted
+        published_obj = self.get_published_version()
+        if not published_obj:
+            return
+
+        for field in published_obj._meta.local_fields:
+            if not field.primary_key and field.name != 'publisher_is_draft':
+                setattr(self, field.attname, getattr(published_obj, field.attname))
+        self.publisher_is_dirty = False
+        self.save(suppress_modified=True)
+
+        return self
+
+    def apublish(self, cascade=False):
+        """
+        Awaitable version of ``publish()``, run in the publisher thread pool.
+        """
+        return run_in_executor(self.publish, cascade=cascade)
+
+    def aunpublish(self):
+        """
+        Awaitable version of ``unpublish()``, run in the publisher thread pool.
+        """
+        return run_in_executor(self.unpublish)
+
+    def arevert_to_public(self):
+        """
+        Awaitable version of ``revert_to_public()``, run in the publisher thread pool.
+        """
+        return run_in_executor(self.revert_to_public)
+
+    def get_versions(self):
+        return get_versions(self)
+
+    @assert_draft
+    def rollback_to(self, version):
+        """
+        Restore the draft to a previously published version and publish it.
+        """
+        with transaction.atomic():
+            versions = self.get_versions()
+            versions.get(version=version)
+            restore_state(self, build_state(versions, version))
+            self.publish()
+
+        return self
+
     def get_unique_together(self):
         return self._meta.unique_together
 
@@ -206,11 +482,9 @@ class PublisherModelBase(models.Model):
 
     @staticmethod
     def clone_translations(src_obj, dst_obj):
-        if hasattr(src_obj, 'translations'):
-            for translation in src_obj.translations.all():
-                translation.pk = None
-                translation.master = dst_obj
-                translation.save()
+        cloner = get_translation_cloner(src_obj.__class__)
+        if cloner is not None:
+            cloner.clone([(src_obj, dst_obj)])
 
     def clone_placeholder(self, src_obj, dst_obj):
         try:
@@ -218,6 +492,7 @@ class PublisherModelBase(models.Model):
         except ImportError:
             return
 
+        placeholders = []
         for field in self.get_placeholder_fields(src_obj):
             src_placeholder = getattr(src_obj, field)
             dst_placeholder = getattr(dst_obj, field)
@@ -226,16 +501,28 @@ class PublisherModelBase(models.Model):
             dst_placeholder.save()
 
             setattr(dst_obj, field, dst_placeholder)
-            dst_obj.save()
+            placeholders.append((src_placeholder, dst_placeholder))
+
+        if not placeholders:
+            return
 
-            src_plugins = src_placeholder.get_plugins_list()
+        dst_obj.save()
 
-            # CMS automatically generates a new Placeholder ID
-            copy_plugins_to(src_plugins, dst_placeholder)
+        for src_placeholder, dst_placeholder in placeholders:
+            # Stream the plugins in tree order, copying whole subtrees at a time
+            src_plugins = src_placeholder.get_plugins().order_by('path').iterator()
+            for plugins in chunk_plugins(src_plugins, self.publisher_plugin_chunk_size):
+                copy_plugins_to(plugins, dst_placeholder)
+
+    @staticmethod
+    def clone_publisher_relations(src_obj, dst_obj):
+        cloner = get_relation_cloner(src_obj.__class__)
+        if cloner is not None:
+            cloner.clone([(src_obj, dst_obj)])
 
     def clone_relations(self, src_obj, dst_obj):
         """
-        Since copying relations is so complex, leave this to the implementing class
+        Clone the relations not covered by ``publisher_relations``, left to the implementing class
         """
         pass
 
@@ -267,6 +554,149 @@ class PublisherModelBase(models.Model):
     def update_modified_at(self):
         self.publisher_modified_at = timezone.now()
 
+    def update_dirty_flag(self):
+        self.publisher_is_dirty = self.is_draft
+
+
+class PublisherVersion(models.Model):
+    content_type = models.ForeignKey('contenttypes.ContentType', on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    version = models.PositiveIntegerField()
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+    is_snapshot = models.BooleanField(default=False)
+    delta = models.BinaryField()
+
+    class Meta:
+        ordering = ('version', )
+        unique_together = (
+            ('content_type', 'object_id', 'version'),
+        )
+
+    def get_delta(self):
+        return decompress_delta(self.delta)
+
+
+class PublisherGeneration(models.Model):
+    """
+    Counts the publishes of a model, to expire the published instances cached in memory.
+    """
+    content_type = models.OneToOneField('contenttypes.ContentType', on_delete=models.CASCADE)
+    generation = models.PositiveIntegerField(default=0)
+
+
+@python_2_unicode_compatible
+class Release(models.Model):
+    """
+    A set of drafts, possibly of different models, published together.
+    """
+    name = models.CharField(max_length=255)
+    created_at = models.DateTimeField(default=timezone.now)
+    published_at = models.DateTimeField(null=True, editable=False)
+    publish_duration = models.FloatField(null=True, editable=False)
+
+    class Meta:
+        ordering = ('-created_at', )
+
+    def __str__(self):
+        return self.name
+
+    def add(self, *drafts):
+        from django.contrib.contenttypes.models import ContentType
+
+        existing = set(self.items.values_list('content_type', 'object_id'))
+        items = []
+        for draft in drafts:
+            content_type = ContentType.objects.get_for_model(draft.__class__)
+            if (content_type.pk, draft.pk) not in existing:
+                existing.add((content_type.pk, draft.pk))
+                items.append(ReleaseItem(release=self, content_type=content_type,
+                                         object_id=draft.pk))
+        ReleaseItem.objects.bulk_create(items)
+
+    def remove(self, *drafts):
+        from django.contrib.contenttypes.models import ContentType
+
+        for draft in drafts:
+            content_type = ContentType.objects.get_for_model(draft.__class__)
+            self.items.filter(content_type=content_type, object_id=draft.pk).delete()
+
+    def get_drafts(self):
+        """
+        Return the (model, draft pks) of the release, grouped by model.
+        """
+        from django.contrib.contenttypes.models import ContentType
+
+        object_ids = OrderedDict()
+        for content_type_id, object_id in self.items.order_by('content_type', 'object_id') \
+                                                    .values_list('content_type', 'object_id'):
+            object_ids.setdefault(content_type_id, []).append(object_id)
+
+        return [
+            (ContentType.objects.get_for_id(content_type_id).model_class(), pks)
+            for content_type_id, pks in object_ids.items()
+        ]
+
+    def publish(self, progress=None):
+        """
+        Publish every draft of the release in a single transaction, with bulk queries per model.
+
+        ``progress`` is called with (model, done, total) after each model is published.
+        Return the number of drafts and published drafts and the duration, per model.
+        """
+        from .bulk import bulk_publish
+
+        start = time.time()
+        groups = self.get_drafts()
+        total = sum(len(pks) for model, pks in groups)
+        done = 0
+        stats = OrderedDict()
+
+        with transaction.atomic():
+            for model, pks in groups:
+                model_start = time.time()
+                published = bulk_publish(model, model._default_manager.filter(pk__in=pks))
+                done += len(pks)
+                stats['%s.%s' % (model._meta.app_label, model._meta.object_name)] = {
+                    'count': len(pks),
+                    'published': len(published),
+                    'duration': time.time() - model_start,
+                }
+                if progress is not None:
+                    progress(model, done, total)
+
+            self.published_at = timezone.now()
+            self.publish_duration = time.time() - start
+            self.save()
+
+        return stats
+
+
+class PublisherPendingPublish(models.Model):
+    """
+    A draft saved with ``publisher_auto_publish``, published by ``publisher_publish_pending``
+    once ``due_at`` is reached.
+    """
+    content_type = models.ForeignKey('contenttypes.ContentType', on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    created_at = models.DateTimeField(default=timezone.now)
+    due_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        unique_together = (
+            ('content_type', 'object_id'),
+        )
+
+
+class ReleaseItem(models.Model):
+    release = models.ForeignKey(Release, related_name='items', on_delete=models.CASCADE)
+    content_type = models.ForeignKey('contenttypes.ContentType', on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+
+    class Meta:
+        unique_together = (
+            ('release', 'content_type', 'object_id'),
+        )
+
 
 class PublisherModel(PublisherModelBase):
     objects = models.Manager()
@@ -281,5 +711,45 @@ class PublisherModel(PublisherModelBase):
     def save(self, suppress_modified=False, **kwargs):
         if suppress_modified is False:
             self.update_modified_at()
+            self.update_dirty_flag()
 
         super(PublisherModel, self).save(**kwargs)
+
+        if suppress_modified is False and self.publisher_auto_publish and self.is_draft:
+            schedule_auto_publish(self)
+
+
+class PublisherContentHashMixin(models.Model):
+    """
+    Tracks the dirtiness of drafts with a hash of their content rather than their modification
+    date, so that saving unchanged content doesn't require publishing again.
+    """
+    publisher_content_hash = models.CharField(
+        max_length=40,
+        blank=True,
+        editable=False,
+        db_index=True)
+
+    class Meta:
+        abstract = True
+
+    def is_content_changed(self, published_obj):
+        # The drafts saved before adding the hash have none, and are dirty
+        return not self.publisher_content_hash or \
+            self.publisher_content_hash != published_obj.publisher_content_hash
+
+    def update_dirty_flag(self):
+        published_obj = self.get_published_version() if self.pk is not None else None
+        self.publisher_is_dirty = self.is_draft and (
+            published_obj is None or self.is_content_changed(published_obj))
+
+    def publish_draft(self):
+        if self.is_draft:
+            fill_content_hash(self)
+        super(PublisherContentHashMixin, self).publish_draft()
+
+    def save(self, *args, **kwargs):
+        if self.is_draft:
+            self.publisher_content_hash = get_content_hash(self)
+
+        super(PublisherContentHashMixin, self).save(*args, **kwargs)
@@ -0,0 +1,152 @@
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from .versions import serialize_field
+
+CURSOR_SALT = 'publisher.cursor'
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def get_keyset_ordering(model, ordering):
+    """
+    Return the (field name, descending) pairs of ``ordering``, ending with the primary key so
+    that the ordering is unique.
+    """
+    keys = []
+    for name in ordering:
+        descending = name.startswith('-')
+        name = name.lstrip('-')
+        if name == 'pk':
+            name = model._meta.pk.name
+        keys.append((name, descending))
+
+    if model._meta.pk.name not in [name for name, descending in keys]:
+        keys.append((model._meta.pk.name, keys[-1][1] if keys else False))
+    return keys
+
+
+class KeysetPage(object):
+
+    def __init__(self, object_list, paginator, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return '<KeysetPage of %d objects>' % len(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator(object):
+    """
+    Paginates ``queryset`` on the values of ``ordering`` rather than with an offset, so that
+    every page is read with an index range scan, however deep.
+
+    The pages are designated by opaque signed cursors. ``count`` is None unless
+    ``with_count``, and only queried when used.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('-publisher_published_at', '-pk'),
+                 with_count=True):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.keys = get_keyset_ordering(queryset.model, ordering)
+        self.with_count = with_count
+
+    @cached_property
+    def count(self):
+        if not self.with_count:
+            return None
+        return self.queryset.count()
+
+    def get_fields(self):
+        opts = self.queryset.model._meta
+        return [opts.get_field(name) for name, descending in self.keys]
+
+    def get_ordering(self, reverse=False):
+        return [
+            '%s%s' % ('-' if descending != reverse else '', name)
+            for name, descending in self.keys
+        ]
+
+    def get_filter(self, values, reverse=False):
+        # (a, b) after (x, y) is a > x OR (a = x AND b > y)
+        condition = None
+        equal = {}
+        for (name, descending), value in zip(self.keys, values):
+            lookup = 'lt' if descending != reverse else 'gt'
+            key_condition = Q(**dict(equal, **{'%s__%s' % (name, lookup): value}))
+            condition = key_condition if condition is None else condition | key_condition
+            equal[name] = value
+        return condition
+
+    def encode_cursor(self, obj, previous=False):
+        values = [serialize_field(field, obj) for field in self.get_fields()]
+        return signing.dumps({'v': values, 'p': previous}, salt=CURSOR_SALT, compress=True)
+
+    def decode_cursor(self, cursor):
+        try:
+            data = signing.loads(cursor, salt=CURSOR_SALT)
+            fields = self.get_fields()
+            if len(data['v']) != len(fields):
+                raise InvalidCursor()
+            values = [
+                None if value is None else field.to_python(value)
+                for field, value in zip(fields, data['v'])
+            ]
+        except (signing.BadSignature, ValidationError, KeyError, TypeError, ValueError):
+            raise InvalidCursor()
+        if None in values:
+            # The ordering fields must not be null
+            raise InvalidCursor()
+        return values, bool(data['p'])
+
+    def page(self, cursor=None):
+        """
+        Return the page following the object of ``cursor``, or preceding it for the cursors
+        of previous pages, or the first page.
+        """
+        previous = False
+        queryset = self.queryset
+        if cursor:
+            values, previous = self.decode_cursor(cursor)
+            queryset = queryset.filter(self.get_filter(values, reverse=previous))
+
+        # One more object tells whether there is another page
+        objects = list(queryset.order_by(*self.get_ordering(reverse=previous))[:self.per_page + 1])
+        has_more = len(objects) > self.per_page
+        objects = objects[:self.per_page]
+        if previous:
+            objects.reverse()
+
+        next_cursor = previous_cursor = None
+        if objects:
+            if has_more or previous:
+                next_cursor = self.encode_cursor(objects[-1])
+            if (has_more and previous) or (cursor and not previous):
+                previous_cursor = self.encode_cursor(objects[0], previous=True)
+
+        return KeysetPage(objects, self, next_cursor, previous_cursor)
@@ -0,0 +1,111 @@
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .signals import (
+    publisher_pre_publish,
+    publisher_post_publish,
+    publisher_pre_unpublish,
+    publisher_post_unpublish,
+)
+from .utils import OnCommitBatch
+
+_purger = {}
+
+
+class BasePurger(object):
+    """
+    Base class of the backends invalidating the HTTP caches by surrogate key.
+    """
+
+    def purge(self, keys):
+        raise NotImplementedError
+
+
+class LocMemPurger(BasePurger):
+    """
+    Keeps the purged keys in memory, for tests.
+    """
+    purged = []
+
+    def purge(self, keys):
+        LocMemPurger.purged.append(sorted(keys))
+
+
+def get_purger():
+    path = getattr(settings, 'PUBLISHER_CACHE_PURGER', None)
+    if not path:
+        return None
+    if path not in _purger:
+        _purger[path] = import_string(path)()
+    return _purger[path]
+
+
+def get_model_key(model):
+    # Published copies in split storage are keyed after their draft model
+    model = getattr(model, 'publisher_draft_model', None) or model
+    return '%s.%s' % (model._meta.app_label, model._meta.model_name)
+
+
+def get_object_key(obj):
+    return '%s.%s' % (get_model_key(obj.__class__), obj.pk)
+
+
+def add_surrogate_keys(request, keys):
+    """
+    Record the keys rendered in the response to ``request``.
+    """
+    if not hasattr(request, 'publisher_surrogate_keys'):
+        request.publisher_surrogate_keys = set()
+    request.publisher_surrogate_keys.update(keys)
+
+
+def get_published_keys(draft):
+    """
+    Return the keys of the responses rendering the published version of ``draft``.
+    """
+    keys = [get_model_key(draft.__class__)]
+    if draft.publisher_split_storage or draft.publisher_database:
+        published_pk = draft.pk
+    else:
+        published_pk = draft.publisher_linked_id
+    if published_pk is not None:
+        keys.append('%s.%s' % (keys[0], published_pk))
+    return keys
+
+
+def flush_purge(keys):
+    purger = get_purger()
+    if purger is not None:
+        purger.purge(keys)
+
+
+_purges = OnCommitBatch(flush_purge)
+
+
+def schedule_purge(keys):
+    """
+    Purge ``keys`` once the current transaction is committed, batching all the keys purged
+    within the same transaction.
+    """
+    if get_purger() is None:
+        return
+    _purges.add(keys)
+
+
+def publisher_pre_change(sender, instance, **kwargs):
+    if get_purger() is not None:
+        instance._publisher_purge_keys = get_published_keys(instance)
+
+
+def publisher_post_change(sender, instance, **kwargs):
+    keys = getattr(instance, '_publisher_purge_keys', None)
+    if keys is None:
+        return
+    del instance._publisher_purge_keys
+    schedule_purge(keys)
+
+
+publisher_pre_publish.connect(publisher_pre_change)
+publisher_pre_unpublish.connect(publisher_pre_change)
+publisher_post_publish.connect(publisher_post_change)
+publisher_post_unpublish.connect(publisher_post_change)
@@ -0,0 +1,122 @@
+from django.core.exceptions import ImproperlyConfigured
+
+
+def get_remote_field(field):
+    # Django < 1.9
+    return getattr(field, 'remote_field', None) or field.rel
+
+
+def get_published_pks(model, pks):
+    """
+    Map the ``pks`` of drafts of ``model`` to the primary keys of their published versions,
+    with a single query. Unpublished drafts are left out.
+    """
+    if model.publisher_database:
+        # The published copies keep the primary keys of their drafts in the live database
+        from .databases import get_live_queryset
+        live_pks = get_live_queryset(model).filter(pk__in=pks).values_list('pk', flat=True)
+        return dict((pk, pk) for pk in live_pks)
+
+    if model.publisher_split_storage:
+        # The published copy shares the primary key of its draft
+        published_field = 'publisher_published'
+    else:
+        published_field = 'publisher_linked'
+    return dict(
+        (pk, published_pk)
+        for pk, published_pk in model._default_manager.filter(pk__in=pks)
+                                                      .values_list('pk', published_field)
+        if published_pk is not None
+    )
+
+
+class RelationCloner(object):
+    """
+    Copies the relations listed in ``publisher_relations`` from drafts onto their published
+    copies, with a single bulk insert per relation.
+
+    Many to many fields are copied through their intermediate model, and the objects of reverse
+    foreign keys are duplicated. The many to many fields listed in ``publisher_relations_remap``
+    are linked to the published versions of their targets instead.
+    """
+
+    def __init__(self, model):
+        self.model = model
+
+    def get_fields(self):
+        fields = []
+        for name in self.model.publisher_relations:
+            field = self.model._meta.get_field(name)
+            if field.many_to_many and not field.auto_created:
+                fields.append(field)
+            elif field.one_to_many:
+                fields.append(field)
+            else:
+                raise ImproperlyConfigured(
+                    "'%s.%s' in publisher_relations is neither a many to many field nor a "
+                    "reverse foreign key." % (self.model._meta.object_name, name))
+        return fields
+
+    def clone(self, pairs, using=None):
+        """
+        Clone the relations of each (draft, published) pair, into the ``using`` database if
+        given.
+        """
+        pairs = list(pairs)
+        if not pairs:
+            return
+
+        published_pks = dict((src_obj.pk, dst_obj.pk) for src_obj, dst_obj in pairs)
+
+        for field in self.get_fields():
+            if field.many_to_many:
+                self.clone_many_to_many(field, published_pks, using)
+            else:
+                self.clone_children(field, published_pks, using)
+
+    def clone_many_to_many(self, field, published_pks, using=None):
+        through = get_remote_field(field).through
+        source_attname = through._meta.get_field(field.m2m_field_name()).attname
+        target_attname = through._meta.get_field(field.m2m_reverse_field_name()).attname
+
+        links = list(through._default_manager.filter(**{
+            '%s__in' % source_attname: list(published_pks),
+        }))
+
+        target_pks = None
+        if field.name in self.model.publisher_relations_remap:
+            target_pks = get_published_pks(
+                field.related_model, set(getattr(link, target_attname) for link in links))
+
+        clones = []
+        for link in links:
+            link.pk = None
+            setattr(link, source_attname, published_pks[getattr(link, source_attname)])
+            if target_pks is not None:
+                target_pk = target_pks.get(getattr(link, target_attname))
+                if target_pk is None:
+                    # The target has not been published yet
+                    continue
+                setattr(link, target_attname, target_pk)
+            clones.append(link)
+        through._default_manager.db_manager(using).bulk_create(clones)
+
+    def clone_children(self, rel, published_pks, using=None):
+        attname = rel.field.attname
+
+        children = list(rel.related_model._default_manager.filter(**{
+            '%s__in' % attname: list(published_pks),
+        }))
+        for child in children:
+            child.pk = None
+            setattr(child, attname, published_pks[getattr(child, attname)])
+        rel.related_model._default_manager.db_manager(using).bulk_create(children)
+
+
+def get_relation_cloner(model):
+    """
+    Return the cloner of the relations listed in ``publisher_relations``, if any.
+    """
+    if not model.publisher_relations or model.publisher_database:
+        return None
+    return RelationCloner(model)
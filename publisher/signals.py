@@ -7,9 +7,13 @@ def publisher_pre_delete(sender, **kwargs):
         return
 
     # If the draft record is deleted, the published object should be as well
-    if instance.is_draft and instance.publisher_linked:
+    if instance.is_draft and instance.get_published_version():
         instance.unpublish()
 
+    # The version history can't be rolled back without its draft
+    if instance.is_draft and instance.publisher_versioning:
+        instance.get_versions().delete()
+
 
 # Sent when a model is about to be published (the draft is sent).
 publisher_pre_publish = Signal(providing_args=['instance'])
@@ -0,0 +1,127 @@
+from operator import itemgetter
+
+from django.contrib.sitemaps import Sitemap
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.paginator import Page, Paginator
+from django.core.urlresolvers import reverse
+from django.db.models import Max
+from django.utils.functional import cached_property
+
+from .utils import iter_keyset_batches
+
+
+class PublishedItemsPaginator(Paginator):
+    """
+    Splits the published objects of a sitemap into pages starting at the keys returned by
+    ``get_page_keys()``, so that each page starts with an index lookup rather than an offset.
+    """
+
+    def __init__(self, sitemap):
+        super(PublishedItemsPaginator, self).__init__(sitemap.items(), sitemap.limit)
+        self.sitemap = sitemap
+
+    @cached_property
+    def page_keys(self):
+        return self.sitemap.get_page_keys()
+
+    @cached_property
+    def num_pages(self):
+        if not self.page_keys:
+            return 1 if self.allow_empty_first_page else 0
+        return len(self.page_keys)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        return Page(self.sitemap.iter_page(number, self.page_keys), number, self)
+
+
+class PublisherSitemap(Sitemap):
+    """
+    Sitemap of the published objects of ``model``, reading only the columns of their URL and
+    last modification date.
+
+    The URLs are reversed from ``url_name`` with the ``url_fields`` values as keyword
+    arguments, unless ``location()`` is overridden. The sitemap is split into pages of
+    ``limit`` objects, listed by the sitemap index view.
+    """
+    model = None
+    url_name = None
+    url_fields = ('pk', )
+    # Number of rows read per query
+    chunk_size = 1000
+    # Number of seconds the first keys of the pages are cached for
+    page_keys_timeout = 60 * 60
+
+    def get_queryset(self):
+        return self.model.publisher_manager.published()
+
+    def get_fields(self):
+        fields = ['pk', 'publisher_modified_at']
+        fields.extend(field for field in self.url_fields if field not in fields)
+        return fields
+
+    def items(self):
+        return self.get_queryset().order_by('pk').values(*self.get_fields())
+
+    def get_page_keys_cache_key(self):
+        return 'publisher.sitemap.%s.%s.%d' % (
+            self.__class__.__module__, self.__class__.__name__, self.limit)
+
+    def get_page_keys(self):
+        """
+        Return the first primary key of every page, cached for ``page_keys_timeout`` seconds.
+
+        Each key is found ``limit`` rows after the previous one. The pages extend to the first
+        key of the next page, so outdated keys still cover every object.
+        """
+        cache_key = self.get_page_keys_cache_key()
+        keys = cache.get(cache_key)
+        if keys is not None:
+            return keys
+
+        keys = []
+        queryset = self.get_queryset().order_by('pk').values_list('pk', flat=True)
+        next_keys = list(queryset[:1])
+        while next_keys:
+            keys.append(next_keys[0])
+            next_keys = list(queryset.filter(pk__gt=keys[-1])[self.limit - 1:self.limit])
+
+        cache.set(cache_key, keys, self.page_keys_timeout)
+        return keys
+
+    def iter_page(self, number, page_keys):
+        """
+        Yield the items of page ``number`` of the pages starting at ``page_keys``, read
+        ``chunk_size`` at a time.
+        """
+        if not page_keys:
+            return
+        queryset = self.items()
+        # The first and last pages are open-ended, in case the keys are outdated
+        if number > 1:
+            queryset = queryset.filter(pk__gte=page_keys[number - 1])
+        if number < len(page_keys):
+            queryset = queryset.filter(pk__lt=page_keys[number])
+        for chunk in iter_keyset_batches(queryset, self.chunk_size, get_key=itemgetter('pk')):
+            for item in chunk:
+                yield item
+
+    @property
+    def paginator(self):
+        return PublishedItemsPaginator(self)
+
+    def location(self, item):
+        if self.url_name is None:
+            raise ImproperlyConfigured(
+                '%s requires either a url_name or a location() method.' %
+                self.__class__.__name__)
+        return reverse(self.url_name, kwargs=dict(
+            (field, item[field]) for field in self.url_fields))
+
+    def lastmod(self, item):
+        return item['publisher_modified_at']
+
+    def get_latest_lastmod(self):
+        return self.get_queryset().aggregate(
+            latest=Max('publisher_modified_at'))['latest']
@@ -1,18 +1,71 @@
 (function(){
   var $ = django.jQuery;
+
+  // Delay before the pending checkbox changes are sent in a single request
+  var BATCH_DELAY = 500;
+
+  function getCsrfToken() {
+    var token = $('input[name=csrfmiddlewaretoken]').val();
+    if (token) {
+      return token;
+    }
+    var match = document.cookie.match(/(?:^|;\s*)csrftoken=([^;]*)/);
+    return match ? decodeURIComponent(match[1]) : '';
+  }
+
+  function setPublished(elem, published) {
+    var icons = elem.parent().find('.published-icon img');
+    icons.eq(0).toggle(published);
+    icons.eq(1).toggle(!published);
+    elem.prop('checked', published);
+  }
+
   $(function() {
+    var pending = {};
+    var timer = null;
+
+    function flush() {
+      timer = null;
+      var batches = {};
+      $.each(pending, function(pk, elem) {
+        var url = elem.attr('data-batch');
+        if (!batches[url]) {
+          batches[url] = {publish: [], unpublish: [], elems: {}};
+        }
+        batches[url][elem.is(':checked') ? 'publish' : 'unpublish'].push(pk);
+        batches[url].elems[pk] = elem;
+      });
+      pending = {};
+
+      $.each(batches, function(url, batch) {
+        $.ajax({
+          url: url,
+          type: 'POST',
+          traditional: true,
+          data: {
+            publish: batch.publish,
+            unpublish: batch.unpublish,
+            csrfmiddlewaretoken: getCsrfToken()
+          },
+          success: function(data) {
+            $.each(data.results, function(pk, result) {
+              if (batch.elems[pk] && result.success) {
+                setPublished(batch.elems[pk], result.published);
+              }
+            });
+          }
+        });
+      });
+    }
+
     $('input:checkbox.publish-checkbox').change(function() {
       var elem = $(this);
-      if (elem.is(':checked')) {
-        var url = elem.attr('data-publish');
-      } else {
-        var url = elem.attr('data-unpublish');
+      // Only the last state of each checkbox is sent
+      pending[elem.val()] = elem;
+      if (timer !== null) {
+        clearTimeout(timer);
       }
-      $.get(url, function(data) {
-        if (data.success) {
-          elem.parent().find('.published-icon img').toggle();
-        }
-      });
+      timer = setTimeout(flush, BATCH_DELAY);
     });
   });
 })();
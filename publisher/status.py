@@ -0,0 +1,63 @@
+from collections import OrderedDict
+
+from django.db.models import Case, Count, IntegerField, Q, When
+
+
+def count_if(condition):
+    return Count(Case(When(condition, then=1), output_field=IntegerField()))
+
+
+def get_unpublished_filter(model):
+    if model.publisher_split_storage:
+        return Q(publisher_published__isnull=True)
+    if model.publisher_database:
+        # The live copies can't be joined, unpublishing clears the publication date
+        return Q(publisher_published_at__isnull=True)
+    return Q(publisher_linked__isnull=True)
+
+
+def get_publish_status(model):
+    """
+    Return the number of drafts of ``model``, published or not, and needing publishing, with a
+    single aggregate query.
+    """
+    counts = model.publisher_manager.drafts().order_by().aggregate(
+        drafts=Count('pk'),
+        unpublished=count_if(get_unpublished_filter(model)),
+        dirty=count_if(Q(publisher_is_dirty=True)),
+    )
+    return OrderedDict([
+        ('drafts', counts['drafts']),
+        ('published', counts['drafts'] - counts['unpublished']),
+        ('unpublished', counts['unpublished']),
+        ('dirty', counts['dirty']),
+    ])
+
+
+def get_scheduled_counts():
+    """
+    Return the number of pending auto-publishes per model, with a single grouped query.
+    """
+    from django.contrib.contenttypes.models import ContentType
+    from .models import PublisherPendingPublish
+
+    counts = PublisherPendingPublish.objects.order_by().values('content_type') \
+                                                       .annotate(count=Count('pk'))
+    return dict(
+        (ContentType.objects.get_for_id(row['content_type']).model_class(), row['count'])
+        for row in counts
+    )
+
+
+def get_status(models):
+    """
+    Return the publish status of each of ``models``, by model label.
+    """
+    from .exchange import get_model_label
+
+    scheduled = get_scheduled_counts()
+    status = OrderedDict()
+    for model in models:
+        status[get_model_label(model)] = get_publish_status(model)
+        status[get_model_label(model)]['scheduled'] = scheduled.get(model, 0)
+    return status
@@ -0,0 +1,148 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.db import models
+from django.utils import six
+
+from .relations import get_remote_field
+from .translations import TranslationCloner, get_translation_cloner
+from .utils import NotDraftException
+
+
+class PublisherPublishedModelBase(models.Model):
+    """
+    Base class of the generated models holding published copies in split storage mode.
+    """
+    STATE_PUBLISHED = False
+    STATE_DRAFT = True
+
+    class Meta:
+        abstract = True
+
+    @property
+    def is_draft(self):
+        return False
+
+    @property
+    def is_published(self):
+        return True
+
+    @property
+    def is_dirty(self):
+        return False
+
+    def publish(self):
+        raise NotDraftException()
+
+    def unpublish(self):
+        raise NotDraftException()
+
+    def revert_to_public(self):
+        raise NotDraftException()
+
+
+def get_published_fields(model):
+    """
+    Return the concrete fields of a draft model which are copied into its published model.
+    """
+    return [
+        field for field in model._meta.local_fields
+        if not field.primary_key and field.name != 'publisher_linked'
+    ]
+
+
+def clone_field(field):
+    name, path, args, kwargs = field.deconstruct()
+    if field.is_relation:
+        # Reverse accessors would clash with the ones of the draft model
+        kwargs['related_name'] = '+'
+    if field.name == 'publisher_is_draft':
+        # Every row of the published table is published, no need to index it
+        kwargs['default'] = False
+        kwargs.pop('db_index', None)
+    return field.__class__(*args, **kwargs)
+
+
+def create_published_model(model):
+    """
+    Generate the model storing the published copies of ``model``.
+
+    The published copy shares the primary key of its draft.
+    """
+    opts = model._meta
+    meta_attrs = {
+        'app_label': opts.app_label,
+        'db_table': '%s_published' % opts.db_table,
+        'ordering': opts.ordering,
+        'verbose_name': '%s (published)' % opts.verbose_name,
+        'verbose_name_plural': '%s (published)' % opts.verbose_name_plural,
+        'default_permissions': (),
+    }
+    meta_attrs.update(model.publisher_published_meta)
+
+    attrs = {
+        '__module__': model.__module__,
+        'Meta': type(str('Meta'), (object, ), meta_attrs),
+        'publisher_draft_model': model,
+        'publisher_draft': models.OneToOneField(
+            model,
+            primary_key=True,
+            related_name='publisher_published',
+            on_delete=models.CASCADE),
+    }
+    for field in get_published_fields(model):
+        attrs[field.name] = clone_field(field)
+
+    for name in model.publisher_published_methods:
+        method = getattr(model, name, None)
+        if method is not None:
+            attrs[name] = six.get_unbound_function(method)
+
+    name = str('%sPublished' % model.__name__)
+    published_model = type(name, (PublisherPublishedModelBase, ), attrs)
+    model.publisher_published_model = published_model
+    return published_model
+
+
+def check_split_storage(model):
+    """
+    Refuse the relations which can't be copied into the published table of ``model``.
+    """
+    if model.publisher_relations:
+        raise ImproperlyConfigured(
+            '%s: publisher_relations are not supported with publisher_split_storage.' %
+            model.__name__)
+    if get_translation_cloner(model) is not None:
+        raise ImproperlyConfigured(
+            '%s: translations are not supported with publisher_split_storage.' % model.__name__)
+
+
+def check_translation_master(model):
+    """
+    Refuse the translations of a split storage model, usually defined after it.
+    """
+    for field in model._meta.local_fields:
+        if field.name != TranslationCloner.master_field or not field.is_relation:
+            continue
+        master_model = get_remote_field(field).model
+        if not isinstance(master_model, type):
+            # Lazy reference, checked when the master model is prepared
+            continue
+        if getattr(master_model, 'publisher_split_storage', False):
+            raise ImproperlyConfigured(
+                '%s: translations are not supported with publisher_split_storage.' %
+                master_model.__name__)
+
+
+def publisher_class_prepared(sender, **kwargs):
+    if not getattr(sender, 'publisher_split_storage', False):
+        check_translation_master(sender)
+        return
+
+    opts = sender._meta
+    if opts.abstract or opts.proxy or opts.swapped:
+        return
+
+    check_split_storage(sender)
+    create_published_model(sender)
+
+
+models.signals.class_prepared.connect(publisher_class_prepared)
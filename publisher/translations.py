@@ -0,0 +1,78 @@
+class TranslationCloner(object):
+    """
+    Copies the translation rows of drafts onto their published copies, with a single
+    bulk insert per translation model.
+    """
+    master_field = 'master'
+
+    def __init__(self, model):
+        self.model = model
+
+    def get_translation_models(self, obj):
+        return [obj.translations.model]
+
+    def clone(self, pairs, using=None):
+        """
+        Clone the translations of each (draft, published) pair, into the ``using`` database
+        if given.
+        """
+        pairs = list(pairs)
+        if not pairs:
+            return
+
+        published_pks = dict((src_obj.pk, dst_obj.pk) for src_obj, dst_obj in pairs)
+        master_attname = '%s_id' % self.master_field
+
+        for translation_model in self.get_translation_models(pairs[0][0]):
+            translations = list(translation_model._default_manager.filter(**{
+                '%s__in' % master_attname: list(published_pks),
+            }))
+            for translation in translations:
+                master_pk = getattr(translation, master_attname)
+                translation.pk = None
+                setattr(translation, master_attname, published_pks[master_pk])
+            translation_model._default_manager.db_manager(using).bulk_create(translations)
+
+        for src_obj, dst_obj in pairs:
+            self.invalidate(dst_obj)
+
+    def invalidate(self, obj):
+        pass
+
+
+class HvadTranslationCloner(TranslationCloner):
+
+    def get_translation_models(self, obj):
+        return [self.model._meta.translations_model]
+
+    def invalidate(self, obj):
+        # Drop the translation hvad cached on the instance
+        cache_name = self.model._meta.translations_cache
+        if hasattr(obj, cache_name):
+            delattr(obj, cache_name)
+
+
+class ParlerTranslationCloner(TranslationCloner):
+
+    def get_translation_models(self, obj):
+        return [meta.model for meta in self.model._parler_meta]
+
+    def invalidate(self, obj):
+        from parler.cache import _delete_cached_translations
+
+        # Both the shared cache and the one of the instance may hold stale translations
+        _delete_cached_translations(obj)
+        obj._translations_cache.clear()
+
+
+def get_translation_cloner(model):
+    """
+    Return the translation cloner matching the translation backend of ``model``, if any.
+    """
+    if getattr(model._meta, 'translations_model', None) is not None:
+        return HvadTranslationCloner(model)
+    if getattr(model, '_parler_meta', None) is not None:
+        return ParlerTranslationCloner(model)
+    if hasattr(model, 'translations'):
+        return TranslationCloner(model)
+    return None
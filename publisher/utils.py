@@ -1,7 +1,21 @@
+import threading
+from operator import attrgetter
+
+from django.db import transaction
+
+
 class NotDraftException(Exception):
     pass
 
 
+class PublisherConflictException(Exception):
+    pass
+
+
+class PublisherCycleException(Exception):
+    pass
+
+
 def assert_draft(method):
     def decorated(self, *args, **kwargs):
         if not self.is_draft:
@@ -9,3 +23,76 @@ def assert_draft(method):
 
         return method(self, *args, **kwargs)
     return decorated
+
+
+def chunk_plugins(plugins, size):
+    """
+    Group plugins listed in tree order into chunks of about ``size`` plugins.
+
+    Chunks only break before a root plugin, so each one holds complete plugin trees.
+    """
+    chunk = []
+    for plugin in plugins:
+        if plugin.parent_id is None and len(chunk) >= size:
+            yield chunk
+            chunk = []
+        chunk.append(plugin)
+
+    if chunk:
+        yield chunk
+
+
+def iter_keyset_batches(queryset, batch_size, get_key=None):
+    """
+    Yield the rows of ``queryset`` in primary key order, ``batch_size`` at a time, each batch
+    being read from the last key of the previous one rather than with an offset.
+
+    ``get_key`` returns the primary key of a row, by default its ``pk``.
+    """
+    if get_key is None:
+        get_key = attrgetter('pk')
+
+    queryset = queryset.order_by('pk')
+    last_pk = None
+    while True:
+        batch_qs = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        batch = list(batch_qs[:batch_size])
+        if not batch:
+            return
+        last_pk = get_key(batch[-1])
+        yield batch
+
+
+class OnCommitBatch(object):
+    """
+    Collects the items added within a transaction, and passes them all at once to ``flush``
+    when the transaction is committed.
+
+    Outside of a transaction, and on Django < 1.9, the items are flushed right away.
+    """
+
+    def __init__(self, flush):
+        self.flush = flush
+        self.local = threading.local()
+
+    def add(self, items):
+        pending = getattr(self.local, 'items', None)
+        if pending is None:
+            pending = self.local.items = set()
+        pending.update(items)
+
+        on_commit = getattr(transaction, 'on_commit', None)
+        if on_commit is None:
+            # Django < 1.9
+            self.run()
+        else:
+            # Registered on each add, as the callbacks of a rolled back savepoint are dropped:
+            # the first callback run flushes the batch, the next ones find it empty. The items
+            # of a rolled back transaction are flushed along with the next batch.
+            on_commit(self.run)
+
+    def run(self):
+        items = getattr(self.local, 'items', None)
+        self.local.items = None
+        if items:
+            self.flush(items)
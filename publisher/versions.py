@@ -0,0 +1,241 @@
+import json
+import zlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.utils import timezone
+
+
+def get_version_retention():
+    """
+    Return the configured (count, max_age) retention of published versions.
+    """
+    count = getattr(settings, 'PUBLISHER_VERSION_RETENTION', None)
+    max_age = getattr(settings, 'PUBLISHER_VERSION_MAX_AGE', None)
+    if max_age is not None and not isinstance(max_age, timedelta):
+        max_age = timedelta(seconds=max_age)
+    return count, max_age
+
+
+def compress_delta(delta):
+    return zlib.compress(json.dumps(delta, sort_keys=True).encode('utf-8'))
+
+
+def decompress_delta(data):
+    return json.loads(zlib.decompress(bytes(data)).decode('utf-8'))
+
+
+def serialize_field(field, obj):
+    if field.value_from_object(obj) is None:
+        return None
+    return field.value_to_string(obj)
+
+
+def get_versioned_fields(model):
+    return [
+        field for field in model._meta.concrete_fields
+        if not field.primary_key and
+        field.name not in model.publisher_ignore_fields and
+        field.name not in (
+            'publisher_published_at', 'publisher_modified_at', 'publisher_content_hash')
+    ]
+
+
+def get_translation_fields(translation_model):
+    return [
+        field for field in translation_model._meta.concrete_fields
+        if not field.primary_key and field.name not in ('master', 'language_code')
+    ]
+
+
+def get_state(obj):
+    """
+    Return the versioned state of ``obj``: its scalar fields and its translation rows.
+    """
+    state = {
+        'fields': dict(
+            (field.name, serialize_field(field, obj))
+            for field in get_versioned_fields(obj.__class__)
+        ),
+        'translations': {},
+    }
+
+    if hasattr(obj, 'translations'):
+        fields = get_translation_fields(obj.translations.model)
+        for translation in obj.translations.all():
+            state['translations'][translation.language_code] = dict(
+                (field.name, serialize_field(field, translation)) for field in fields
+            )
+
+    return state
+
+
+def diff_states(old, new):
+    """
+    Return the field-level delta turning state ``old`` into state ``new``.
+
+    Translations removed in ``new`` are recorded as None.
+    """
+    delta = {
+        'fields': dict(
+            (name, value) for name, value in new['fields'].items()
+            if old['fields'].get(name, None) != value or name not in old['fields']
+        ),
+        'translations': {},
+    }
+
+    for language, values in new['translations'].items():
+        old_values = old['translations'].get(language) or {}
+        changed = dict(
+            (name, value) for name, value in values.items()
+            if old_values.get(name, None) != value or name not in old_values
+        )
+        if changed or language not in old['translations']:
+            delta['translations'][language] = changed
+
+    for language in old['translations']:
+        if language not in new['translations']:
+            delta['translations'][language] = None
+
+    return delta
+
+
+def apply_delta(state, delta):
+    state['fields'].update(delta['fields'])
+    for language, values in delta['translations'].items():
+        if values is None:
+            state['translations'].pop(language, None)
+        else:
+            state['translations'].setdefault(language, {}).update(values)
+    return state
+
+
+def empty_state():
+    return {'fields': {}, 'translations': {}}
+
+
+def get_versions(obj):
+    from .models import PublisherVersion
+    content_type = ContentType.objects.get_for_model(obj.__class__)
+    return PublisherVersion.objects.filter(content_type=content_type, object_id=obj.pk)
+
+
+def build_state(versions, version):
+    """
+    Rebuild the state of ``version`` from the closest snapshot and the following deltas.
+    """
+    versions = versions.filter(version__lte=version)
+    snapshot = versions.filter(is_snapshot=True).order_by('-version').first()
+    if snapshot is not None:
+        versions = versions.filter(version__gte=snapshot.version)
+
+    state = None
+    for version_obj in versions.order_by('version'):
+        delta = version_obj.get_delta()
+        if state is None or version_obj.is_snapshot:
+            state = empty_state()
+        apply_delta(state, delta)
+
+    return state
+
+
+def record_version(obj):
+    """
+    Store the published state of the draft ``obj`` as a delta against its previous version.
+    """
+    from .models import PublisherVersion
+
+    versions = get_versions(obj)
+    last = versions.order_by('-version').first()
+    state = get_state(obj)
+
+    if last is None:
+        number = 1
+        is_snapshot = True
+        delta = state
+    else:
+        number = last.version + 1
+        is_snapshot = False
+        delta = diff_states(build_state(versions, last.version), state)
+
+    return PublisherVersion.objects.create(
+        content_type=ContentType.objects.get_for_model(obj.__class__),
+        object_id=obj.pk,
+        version=number,
+        is_snapshot=is_snapshot,
+        delta=compress_delta(delta))
+
+
+def restore_state(obj, state):
+    """
+    Write ``state`` onto the draft ``obj`` and its translation rows.
+    """
+    for field in get_versioned_fields(obj.__class__):
+        if field.name in state['fields']:
+            value = state['fields'][field.name]
+            if value is not None:
+                value = field.to_python(value)
+            setattr(obj, field.attname, value)
+    obj.save()
+
+    if not hasattr(obj, 'translations'):
+        return
+
+    translation_model = obj.translations.model
+    fields = get_translation_fields(translation_model)
+    existing = dict((t.language_code, t) for t in obj.translations.all())
+
+    for language, translation in existing.items():
+        if language not in state['translations']:
+            translation.delete()
+
+    for language, values in state['translations'].items():
+        translation = existing.get(language)
+        if translation is None:
+            translation = translation_model(master=obj, language_code=language)
+        for field in fields:
+            if field.name in values:
+                value = values[field.name]
+                if value is not None:
+                    value = field.to_python(value)
+                setattr(translation, field.attname, value)
+        translation.save()
+
+
+def prune_versions(versions, keep=None, max_age=None):
+    """
+    Drop the versions outside the retention of one object, folding them into a snapshot of the
+    oldest version kept. The latest version is always kept.
+
+    Return the number of deleted versions.
+    """
+    numbers = list(versions.order_by('-version').values_list('version', 'created_at'))
+    if not numbers:
+        return 0
+
+    kept = numbers[:1]
+    for number, created_at in numbers[1:]:
+        if keep is not None and len(kept) >= keep:
+            break
+        if max_age is not None and created_at < timezone.now() - max_age:
+            break
+        kept.append((number, created_at))
+
+    oldest_kept = kept[-1][0]
+    if oldest_kept == numbers[-1][0]:
+        return 0
+
+    with transaction.atomic():
+        state = build_state(versions, oldest_kept)
+        snapshot = versions.get(version=oldest_kept)
+        snapshot.is_snapshot = True
+        snapshot.delta = compress_delta(state)
+        snapshot.save()
+
+        deleted = versions.filter(version__lt=oldest_kept)
+        count = deleted.count()
+        deleted.delete()
+
+    return count
@@ -1,7 +1,11 @@
+from django.http import Http404
 from django.views.generic import ListView
 from django.views.generic.detail import DetailView
 
+from .databases import get_live_queryset
 from .middleware import get_draft_status
+from .pagination import InvalidCursor, KeysetPaginator
+from .purgers import add_surrogate_keys, get_model_key, get_object_key
 
 
 class PublisherViewMixin(object):
@@ -10,12 +14,55 @@ class PublisherViewMixin(object):
         abstract = True
 
     def get_queryset(self):
-        return self.model.objects.filter(publisher_is_draft=get_draft_status()).all()
+        is_draft = get_draft_status(self.request)
+        if not is_draft and self.model.publisher_split_storage:
+            return self.model.publisher_published_model._default_manager.all()
+        if not is_draft and self.model.publisher_database:
+            return get_live_queryset(self.model)
+        return self.model.objects.filter(publisher_is_draft=is_draft).all()
 
 
 class PublisherDetailView(PublisherViewMixin, DetailView):
-    pass
+
+    def get_object(self, queryset=None):
+        obj = super(PublisherDetailView, self).get_object(queryset)
+        add_surrogate_keys(self.request, [get_object_key(obj)])
+        return obj
 
 
 class PublisherListView(PublisherViewMixin, ListView):
-    pass
+    # Paginate on the values of keyset_ordering with cursors, rather than with page numbers
+    keyset_pagination = False
+    # Defaults to the publication date, or the modification date of drafts
+    keyset_ordering = None
+    # Set to False to leave paginator.count unset rather than counting the objects
+    keyset_count = True
+    cursor_kwarg = 'cursor'
+
+    def get_keyset_ordering(self):
+        if self.keyset_ordering is not None:
+            return self.keyset_ordering
+        if get_draft_status(self.request):
+            # Unpublished drafts have no publication date
+            return ('-publisher_modified_at', '-pk')
+        return ('-publisher_published_at', '-pk')
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.keyset_pagination:
+            return super(PublisherListView, self).paginate_queryset(queryset, page_size)
+
+        paginator = KeysetPaginator(
+            queryset, page_size, self.get_keyset_ordering(), with_count=self.keyset_count)
+        cursor = self.kwargs.get(self.cursor_kwarg) or self.request.GET.get(self.cursor_kwarg)
+        try:
+            page = paginator.page(cursor)
+        except InvalidCursor:
+            raise Http404('Invalid cursor.')
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+    def get_context_data(self, **kwargs):
+        context = super(PublisherListView, self).get_context_data(**kwargs)
+        # Purged by any publish, as the list may change; detail responses only get their object
+        add_surrogate_keys(self.request, [get_model_key(self.model)])
+        add_surrogate_keys(self.request, [get_object_key(obj) for obj in context['object_list']])
+        return context
@@ -0,0 +1,14 @@
+from django.contrib import admin
+
+from publisher.admin import PublisherAdmin, PublisherDirtyFilter, PublisherPublishedFilter
+
+from .models import PublisherLiveTestModel, PublisherTestModel, PublisherSplitTestModel
+
+
+class PublisherTestModelAdmin(PublisherAdmin):
+    list_filter = (PublisherPublishedFilter, PublisherDirtyFilter)
+
+
+admin.site.register(PublisherTestModel, PublisherTestModelAdmin)
+admin.site.register(PublisherSplitTestModel, PublisherTestModelAdmin)
+admin.site.register(PublisherLiveTestModel, PublisherTestModelAdmin)
@@ -1,10 +1,120 @@
 from django.db import models
 
 from publisher.managers import PublisherManager
-from publisher.models import PublisherModel
+from publisher.models import PublisherContentHashMixin, PublisherModel
 
 
 class PublisherTestModel(PublisherModel):
     title = models.CharField(max_length=100)
 
     publisher_manager = PublisherManager()
+
+
+class PublisherSplitTestModel(PublisherModel):
+    title = models.CharField(max_length=100)
+
+    publisher_manager = PublisherManager()
+    publisher_split_storage = True
+
+    def __str__(self):
+        return self.title
+
+
+class PublisherVersionedTestModel(PublisherModel):
+    title = models.CharField(max_length=100)
+    body = models.TextField(blank=True, null=True)
+
+    publisher_manager = PublisherManager()
+    publisher_versioning = True
+
+
+class PublisherTranslatedTestModel(PublisherModel):
+    publisher_manager = PublisherManager()
+    publisher_versioning = True
+
+
+class PublisherTranslatedTestModelTranslation(models.Model):
+    master = models.ForeignKey(
+        PublisherTranslatedTestModel, related_name='translations', on_delete=models.CASCADE)
+    language_code = models.CharField(max_length=15)
+    title = models.CharField(max_length=100)
+
+
+class PublisherTestTag(models.Model):
+    name = models.CharField(max_length=100)
+
+
+class PublisherRelatedTestModel(PublisherModel):
+    title = models.CharField(max_length=100)
+    tags = models.ManyToManyField(PublisherTestTag, related_name='+')
+    related = models.ManyToManyField(PublisherTestModel, related_name='+')
+
+    publisher_manager = PublisherManager()
+    publisher_relations = ('tags', 'related', 'items')
+    publisher_relations_remap = ('related', )
+
+
+class PublisherRelatedTestItem(models.Model):
+    parent = models.ForeignKey(
+        PublisherRelatedTestModel, related_name='items', on_delete=models.CASCADE)
+    name = models.CharField(max_length=100)
+
+
+class PublisherCascadeTestModel(PublisherModel):
+    title = models.CharField(max_length=100)
+    author = models.ForeignKey(
+        PublisherTestModel, null=True, related_name='+', on_delete=models.SET_NULL)
+    parent = models.ForeignKey('self', null=True, related_name='+', on_delete=models.SET_NULL)
+    related = models.ManyToManyField(PublisherSplitTestModel, related_name='+')
+
+    publisher_manager = PublisherManager()
+
+
+class PublisherHashedTestModel(PublisherContentHashMixin, PublisherModel):
+    title = models.CharField(max_length=100)
+
+    publisher_manager = PublisherManager()
+
+
+class PublisherHashedTestModelTranslation(models.Model):
+    master = models.ForeignKey(
+        PublisherHashedTestModel, related_name='translations', on_delete=models.CASCADE)
+    language_code = models.CharField(max_length=15)
+    title = models.CharField(max_length=100)
+
+
+class PublisherCachedTestModel(PublisherModel):
+    title = models.CharField(max_length=100)
+    slug = models.CharField(max_length=100)
+
+    publisher_manager = PublisherManager()
+    publisher_cache_instances = True
+
+
+class PublisherLiveTestModel(PublisherModel):
+    title = models.CharField(max_length=100)
+    tags = models.ManyToManyField(PublisherTestTag, related_name='+')
+
+    publisher_manager = PublisherManager()
+    publisher_database = 'live'
+    publisher_relations = ('tags', 'items')
+
+
+class PublisherLiveTestModelTranslation(models.Model):
+    master = models.ForeignKey(
+        PublisherLiveTestModel, related_name='translations', on_delete=models.CASCADE)
+    language_code = models.CharField(max_length=15)
+    title = models.CharField(max_length=100)
+
+
+class PublisherLiveTestItem(models.Model):
+    parent = models.ForeignKey(
+        PublisherLiveTestModel, related_name='items', on_delete=models.CASCADE)
+    name = models.CharField(max_length=100)
+
+
+class PublisherAutoTestModel(PublisherModel):
+    title = models.CharField(max_length=100)
+
+    publisher_manager = PublisherManager()
+    publisher_auto_publish = True
@@ -1,15 +1,74 @@
 import datetime
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
 
 from django import test
+from django.apps.registry import Apps
+from django.contrib.auth.models import Permission, User
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.core.signals import request_started
+from django.db import connection, connections, models, transaction
+from django.http import Http404, HttpResponse
+from django.test.utils import CaptureQueriesContext
+from django.utils import six
+from django.utils.six import StringIO
 from django.utils import timezone
 
-from mock import MagicMock
-
-from publisher.utils import NotDraftException
-from publisher.signals import publisher_post_publish, publisher_post_unpublish
-from publisher.middleware import PublisherMiddleware, get_draft_status
-
-from myapp.models import PublisherTestModel
+from mock import MagicMock, patch
+
+from publisher.utils import (
+    NotDraftException,
+    PublisherConflictException,
+    PublisherCycleException,
+    chunk_plugins,
+)
+from publisher.sitemaps import PublisherSitemap
+from publisher.signals import (
+    publisher_post_publish,
+    publisher_post_unpublish,
+    publisher_publish_pre_save_draft,
+)
+from publisher.middleware import (
+    PublisherMiddleware,
+    get_draft_status,
+    get_preview_token,
+    get_preview_url,
+)
+from publisher import aio
+from publisher.autopublish import publish_pending
+from publisher.cache import PublishedInstanceCache, get_instance_cache
+from publisher.models import (
+    PublisherGeneration,
+    PublisherModel,
+    PublisherPendingPublish,
+    PublisherVersion,
+    Release,
+)
+from publisher.purgers import LocMemPurger
+from publisher.translations import TranslationCloner, get_translation_cloner
+from publisher.views import PublisherDetailView, PublisherListView
+
+from myapp.models import (
+    PublisherAutoTestModel,
+    PublisherLiveTestItem,
+    PublisherLiveTestModel,
+    PublisherCachedTestModel,
+    PublisherCascadeTestModel,
+    PublisherHashedTestModel,
+    PublisherRelatedTestModel,
+    PublisherTestModel,
+    PublisherTestTag,
+    PublisherSplitTestModel,
+    PublisherTranslatedTestModel,
+    PublisherVersionedTestModel,
+)
 
 
 class PublisherTest(test.TestCase):
@@ -283,6 +342,76 @@ class PublisherTest(test.TestCase):
         mock_request = MockRequest()
         self.assertTrue(PublisherMiddleware.is_draft(mock_request))
 
+    def test_middleware_does_not_touch_user_without_preview(self):
+
+        class MockRequest(object):
+            GET = {}
+            COOKIES = {}
+
+            @property
+            def user(self):
+                raise AssertionError('The user should not be loaded')
+
+        mock_request = MockRequest()
+        self.assertFalse(PublisherMiddleware.is_draft(mock_request))
+
+    def test_middleware_detects_draft_with_preview_token(self):
+        user = MagicMock(pk=1)
+
+        class MockRequest(object):
+            GET = {'preview': get_preview_token(user)}
+            COOKIES = {}
+
+        self.assertTrue(PublisherMiddleware.is_draft(MockRequest()))
+
+    def test_middleware_detects_draft_with_preview_cookie(self):
+        user = MagicMock(pk=1)
+
+        class MockRequest(object):
+            GET = {}
+            COOKIES = {'publisher_preview': get_preview_token(user)}
+
+        self.assertTrue(PublisherMiddleware.is_draft(MockRequest()))
+
+    def test_middleware_rejects_tampered_preview_token(self):
+        user = MagicMock(pk=1)
+
+        class MockRequest(object):
+            GET = {'preview': get_preview_token(user) + 'x'}
+            COOKIES = {}
+
+        self.assertFalse(PublisherMiddleware.is_draft(MockRequest()))
+
+    def test_middleware_rejects_expired_preview_token(self):
+        user = MagicMock(pk=1)
+
+        class MockRequest(object):
+            GET = {'preview': get_preview_token(user)}
+            COOKIES = {}
+
+        with self.settings(PUBLISHER_PREVIEW_TOKEN_MAX_AGE=-1):
+            self.assertFalse(PublisherMiddleware.is_draft(MockRequest()))
+
+    def test_middleware_sets_preview_cookie(self):
+        user = MagicMock(pk=1)
+        token = get_preview_token(user)
+
+        class MockRequest(object):
+            GET = {'preview': token}
+            COOKIES = {}
+
+        response = HttpResponse()
+        PublisherMiddleware().process_request(MockRequest())
+        PublisherMiddleware.process_response(MockRequest(), response)
+
+        self.assertEqual(response.cookies['publisher_preview'].value, token)
+
+    def test_preview_url(self):
+        user = MagicMock(pk=1)
+        self.assertTrue(get_preview_url('/news/', user).startswith('/news/?preview='))
+        url = get_preview_url('/news/?page=2', user)
+        self.assertTrue(url.startswith('/news/?page=2&preview='))
+
     def test_middleware_get_draft_status_shortcut_defaults_to_false(self):
         self.assertFalse(get_draft_status())
 
@@ -316,3 +445,1706 @@ class PublisherTest(test.TestCase):
         PublisherMiddleware.process_response(None, None)
 
         self.assertFalse(get_draft_status())
+
+    def test_draft_status_follows_the_request_across_threads(self):
+        request = test.RequestFactory().get('/', {'preview': get_preview_token(MagicMock(pk=1))})
+        PublisherMiddleware().process_request(request)
+
+        status = []
+        thread = threading.Thread(target=lambda: status.append(
+            (get_draft_status(), get_draft_status(request))))
+        thread.start()
+        thread.join()
+        PublisherMiddleware.process_response(request, HttpResponse())
+
+        self.assertEqual(status, [(False, True)])
+
+    def test_view_queryset_uses_request_draft_status(self):
+        instance = PublisherTestModel.publisher_manager.create(title='Test model')
+        instance.publish()
+        request = test.RequestFactory().get('/')
+        request.publisher_is_draft = True
+
+        view = PublisherListView(model=PublisherTestModel, request=request)
+
+        self.assertEqual(list(view.get_queryset()), [instance])
+        self.assertEqual(
+            list(PublisherTestModel.publisher_manager.current(request)), [instance])
+
+
+class PublisherPluginChunkTest(test.SimpleTestCase):
+
+    def test_chunks_hold_complete_plugin_trees(self):
+        plugins = [
+            MagicMock(pk=1, parent_id=None),
+            MagicMock(pk=2, parent_id=1),
+            MagicMock(pk=3, parent_id=2),
+            MagicMock(pk=4, parent_id=None),
+            MagicMock(pk=5, parent_id=None),
+            MagicMock(pk=6, parent_id=5),
+        ]
+        chunks = [[plugin.pk for plugin in chunk] for chunk in chunk_plugins(plugins, 2)]
+        self.assertEqual(chunks, [[1, 2, 3], [4, 5, 6]])
+
+    def test_chunks_are_lazy(self):
+        def plugins():
+            yield MagicMock(pk=1, parent_id=None)
+            yield MagicMock(pk=2, parent_id=None)
+            raise AssertionError('Plugins read ahead of the first chunk')
+
+        chunks = chunk_plugins(plugins(), 1)
+        self.assertEqual([plugin.pk for plugin in next(chunks)], [1])
+
+
+class PublisherSplitStorageTest(test.TestCase):
+
+    def test_publishing_writes_into_the_published_table(self):
+        instance = PublisherSplitTestModel.publisher_manager.create(title='Test model')
+        instance.publish()
+
+        published = PublisherSplitTestModel.publisher_manager.published().get()
+        self.assertIsInstance(published, PublisherSplitTestModel.publisher_published_model)
+        self.assertEqual(published.pk, instance.pk)
+        self.assertEqual(published.title, 'Test model')
+        self.assertTrue(published.is_published)
+        self.assertEqual(str(published), 'Test model')
+        self.assertEqual(PublisherSplitTestModel.objects.count(), 1)
+
+    def test_editing_a_draft_does_not_update_published_record(self):
+        instance = PublisherSplitTestModel.publisher_manager.create(title='Test model')
+        instance.publish()
+        self.assertFalse(instance.is_dirty)
+
+        instance.title = 'Updated test model'
+        instance.save()
+        self.assertTrue(instance.is_dirty)
+        published = PublisherSplitTestModel.publisher_manager.published().get()
+        self.assertEqual(published.title, 'Test model')
+
+        instance.publish()
+        published = PublisherSplitTestModel.publisher_manager.published().get()
+        self.assertEqual(published.title, 'Updated test model')
+        self.assertEqual(PublisherSplitTestModel.publisher_manager.published().count(), 1)
+
+    def test_unpublishing_deletes_published_record(self):
+        instance = PublisherSplitTestModel.publisher_manager.create(title='Test model')
+        instance.publish()
+        instance.unpublish()
+
+        self.assertEqual(PublisherSplitTestModel.publisher_manager.published().count(), 0)
+        self.assertIsNone(instance.publisher_published_at)
+        self.assertTrue(instance.is_dirty)
+
+    def test_deleting_draft_also_deletes_published_record(self):
+        instance = PublisherSplitTestModel.publisher_manager.create(title='Test model')
+        instance.publish()
+        instance.delete()
+
+        self.assertEqual(PublisherSplitTestModel.publisher_manager.published().count(), 0)
+
+    def test_reverting_keeps_the_draft_primary_key(self):
+        instance = PublisherSplitTestModel.publisher_manager.create(title='Test model')
+        instance.publish()
+        instance.title = 'Updated test model'
+        instance.save()
+
+        revert_instance = instance.revert_to_public()
+        self.assertEqual(revert_instance.pk, instance.pk)
+        self.assertEqual(revert_instance.title, 'Test model')
+        self.assertFalse(revert_instance.is_dirty)
+
+    def test_published_records_can_not_be_published(self):
+        instance = PublisherSplitTestModel.publisher_manager.create(title='Test model')
+        instance.publish()
+
+        published = PublisherSplitTestModel.publisher_manager.published().get()
+        self.assertRaises(NotDraftException, published.publish)
+
+    def create_model(self, name, bases, test_apps, **attrs):
+        attrs.update({
+            '__module__': __name__,
+            'Meta': type(str('Meta'), (object, ), {'app_label': 'myapp', 'apps': test_apps}),
+        })
+        return type(str(name), bases, attrs)
+
+    def test_publisher_relations_are_refused(self):
+        with self.assertRaises(ImproperlyConfigured):
+            self.create_model(
+                'SplitRelatedModel', (PublisherModel, ), Apps(),
+                publisher_split_storage=True, publisher_relations=('tags', ))
+
+    def test_translations_are_refused(self):
+        test_apps = Apps()
+        master = self.create_model(
+            'SplitTranslatedModel', (PublisherModel, ), test_apps, publisher_split_storage=True)
+        with self.assertRaises(ImproperlyConfigured):
+            self.create_model(
+                'SplitTranslatedModelTranslation', (models.Model, ), test_apps,
+                master=models.ForeignKey(
+                    master, related_name='translations', on_delete=models.CASCADE))
+
+
+class PublisherVersionTest(test.TestCase):
+
+    def create_versions(self, *titles):
+        instance = PublisherVersionedTestModel.publisher_manager.create(title=titles[0])
+        instance.publish()
+        for title in titles[1:]:
+            instance.title = title
+            instance.save()
+            instance.publish()
+        return instance
+
+    def test_publishing_records_a_version(self):
+        instance = self.create_versions('First', 'Second')
+
+        versions = instance.get_versions()
+        self.assertEqual(list(versions.values_list('version', flat=True)), [1, 2])
+        self.assertTrue(versions.get(version=1).is_snapshot)
+        self.assertEqual(versions.get(version=2).get_delta(), {
+            'fields': {'title': 'Second'},
+            'translations': {},
+        })
+
+    def test_unversioned_models_do_not_record_versions(self):
+        instance = PublisherTestModel.publisher_manager.create(title='Test model')
+        instance.publish()
+        self.assertEqual(PublisherVersion.objects.count(), 0)
+
+    def test_rollback_restores_and_publishes_a_version(self):
+        instance = self.create_versions('First', 'Second', 'Third')
+        instance.body = 'Unpublished body'
+        instance.save()
+
+        instance.rollback_to(1)
+
+        published = PublisherVersionedTestModel.publisher_manager.published().get()
+        self.assertEqual(published.title, 'First')
+        self.assertIsNone(published.body)
+        self.assertEqual(instance.get_versions().count(), 4)
+
+    def test_rollback_to_unknown_version_raises(self):
+        instance = self.create_versions('First')
+        self.assertRaises(PublisherVersion.DoesNotExist, instance.rollback_to, 5)
+
+    def test_prune_versions_compacts_old_deltas(self):
+        instance = self.create_versions('First', 'Second', 'Third', 'Fourth')
+
+        call_command('publisher_prune_versions', keep=2, stdout=StringIO())
+
+        versions = instance.get_versions()
+        self.assertEqual(list(versions.values_list('version', flat=True)), [3, 4])
+        self.assertTrue(versions.get(version=3).is_snapshot)
+
+        instance.rollback_to(3)
+        published = PublisherVersionedTestModel.publisher_manager.published().get()
+        self.assertEqual(published.title, 'Third')
+
+    def test_deleting_draft_deletes_versions(self):
+        instance = self.create_versions('First', 'Second')
+        instance.delete()
+        self.assertEqual(PublisherVersion.objects.count(), 0)
+
+
+class PublisherCacheHeadersTest(test.TestCase):
+
+    def get_response(self, view, params=None, **kwargs):
+        request = test.RequestFactory().get('/', params or {})
+        middleware = PublisherMiddleware()
+        middleware.process_request(request)
+        response = view.as_view(model=PublisherTestModel)(request, **kwargs)
+        return middleware.process_response(request, response)
+
+    def test_published_detail_response_has_surrogate_keys(self):
+        instance = PublisherTestModel.publisher_manager.create(title='Test model')
+        instance.publish()
+        published = PublisherTestModel.publisher_manager.published().get()
+
+        with self.settings(PUBLISHER_CACHE_MAX_AGE=300):
+            response = self.get_response(PublisherDetailView, pk=published.pk)
+
+        self.assertEqual(response['Surrogate-Key'], 'myapp.publishertestmodel.%s' % published.pk)
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('max-age=300', response['Cache-Control'])
+
+    def test_published_list_response_has_surrogate_keys(self):
+        instance = PublisherTestModel.publisher_manager.create(title='Test model')
+        instance.publish()
+        published = PublisherTestModel.publisher_manager.published().get()
+
+        response = self.get_response(PublisherListView)
+
+        self.assertEqual(
+            response['Surrogate-Key'],
+            'myapp.publishertestmodel myapp.publishertestmodel.%s' % published.pk)
+        self.assertFalse(response.has_header('Cache-Control'))
+
+    def test_draft_response_is_not_cacheable(self):
+        instance = PublisherTestModel.publisher_manager.create(title='Test model')
+        token = get_preview_token(MagicMock(pk=1))
+
+        with self.settings(PUBLISHER_CACHE_MAX_AGE=300):
+            response = self.get_response(PublisherDetailView, {'preview': token}, pk=instance.pk)
+
+        self.assertFalse(response.has_header('Surrogate-Key'))
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('no-store', response['Cache-Control'])
+
+
+@test.override_settings(PUBLISHER_CACHE_PURGER='publisher.purgers.LocMemPurger')
+class PublisherPurgeTest(test.TransactionTestCase):
+
+    def setUp(self):
+        LocMemPurger.purged = []
+
+    def test_publishing_purges_the_previous_published_version(self):
+        instance = PublisherTestModel.publisher_manager.create(title='Test model')
+        instance.publish()
+        published_pk = instance.publisher_linked_id
+        instance.save()
+        instance.publish()
+
+        self.assertEqual(LocMemPurger.purged, [
+            ['myapp.publishertestmodel'],
+            ['myapp.publishertestmodel', 'myapp.publishertestmodel.%s' % published_pk],
+        ])
+
+    def test_unpublishing_purges_the_published_version(self):
+        instance = PublisherTestModel.publisher_manager.create(title='Test model')
+        instance.publish()
+        published_pk = instance.publisher_linked_id
+        LocMemPurger.purged = []
+        instance.unpublish()
+
+        self.assertEqual(LocMemPurger.purged, [
+            ['myapp.publishertestmodel', 'myapp.publishertestmodel.%s' % published_pk],
+        ])
+
+    def test_purges_are_batched_per_transaction(self):
+        first = PublisherTestModel.publisher_manager.create(title='First')
+        second = PublisherTestModel.publisher_manager.create(title='Second')
+        first.publish()
+        second.publish()
+        keys = [
+            'myapp.publishertestmodel',
+            'myapp.publishertestmodel.%s' % first.publisher_linked_id,
+            'myapp.publishertestmodel.%s' % second.publisher_linked_id,
+        ]
+        LocMemPurger.purged = []
+
+        with transaction.atomic():
+            first.unpublish()
+            second.unpublish()
+
+        if hasattr(transaction, 'on_commit'):
+            self.assertEqual(LocMemPurger.purged, [sorted(keys)])
+        else:
+            # Django < 1.9 purges immediately
+            self.assertEqual(len(LocMemPurger.purged), 2)
+
+    def test_purges_follow_a_rolled_back_transaction(self):
+        instance = PublisherTestModel.publisher_manager.create(title='Test model')
+        instance.publish()
+        key = 'myapp.publishertestmodel.%s' % instance.publisher_linked_id
+
+        try:
+            with transaction.atomic():
+                instance.unpublish()
+                raise ValueError()
+        except ValueError:
+            pass
+        LocMemPurger.purged = []
+
+        instance = PublisherTestModel.objects.get(pk=instance.pk)
+        with transaction.atomic():
+            instance.unpublish()
+
+        self.assertEqual(len(LocMemPurger.purged), 1)
+        self.assertIn(key, LocMemPurger.purged[0])
+
+
+class PublisherTranslationTest(test.TestCase):
+
+    def create_translated(self, **titles):
+        instance = PublisherTranslatedTestModel.publisher_manager.create()
+        for language_code, title in titles.items():
+            instance.translations.create(language_code=language_code, title=title)
+        return instance
+
+    def get_published_titles(self):
+        published = PublisherTranslatedTestModel.publisher_manager.published().get()
+        return dict(published.translations.values_list('language_code', 'title'))
+
+    def test_translations_are_cloned_with_one_insert(self):
+        instance = self.create_translated(en='Title', fr='Titre', de='Titel')
+        published = PublisherTranslatedTestModel.objects.create(publisher_is_draft=False)
+
+        cloner = get_translation_cloner(PublisherTranslatedTestModel)
+        self.assertIsInstance(cloner, TranslationCloner)
+        with self.assertNumQueries(2):
+            cloner.clone([(instance, published)])
+
+        self.assertEqual(published.translations.count(), 3)
+        self.assertEqual(instance.translations.count(), 3)
+
+    def test_publishing_clones_translations(self):
+        instance = self.create_translated(en='Title', fr='Titre')
+        instance.publish()
+        self.assertEqual(self.get_published_titles(), {'en': 'Title', 'fr': 'Titre'})
+
+    def test_untranslated_models_have_no_cloner(self):
+        self.assertIsNone(get_translation_cloner(PublisherTestModel))
+
+    def test_rollback_restores_translations(self):
+        instance = self.create_translated(en='Title', fr='Titre')
+        instance.publish()
+
+        instance.translations.filter(language_code='en').update(title='New title')
+        instance.translations.filter(language_code='fr').delete()
+        instance.translations.create(language_code='de', title='Titel')
+        instance.save()
+        instance.publish()
+        self.assertEqual(self.get_published_titles(), {'en': 'New title', 'de': 'Titel'})
+
+        instance.rollback_to(1)
+        self.assertEqual(self.get_published_titles(), {'en': 'Title', 'fr': 'Titre'})
+
+
+class PublisherAdminTest(test.TestCase):
+    multi_db = True
+
+    def setUp(self):
+        User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.login(username='admin', password='password')
+
+    def count_changelist_queries(self, model, count, using='default'):
+        for i in range(count):
+            instance = model.publisher_manager.create(title='Test model %d' % i)
+            instance.publish()
+
+        url = '/admin/myapp/%s/' % model._meta.model_name
+        self.client.get(url)
+        with CaptureQueriesContext(connections[using]) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        model.objects.all().delete()
+        return len(queries)
+
+    def test_changelist_queries_do_not_depend_on_rows(self):
+        self.assertEqual(
+            self.count_changelist_queries(PublisherTestModel, 1),
+            self.count_changelist_queries(PublisherTestModel, 5))
+
+    def test_split_storage_changelist_queries_do_not_depend_on_rows(self):
+        self.assertEqual(
+            self.count_changelist_queries(PublisherSplitTestModel, 1),
+            self.count_changelist_queries(PublisherSplitTestModel, 5))
+
+    def test_live_database_changelist_queries_do_not_depend_on_rows(self):
+        self.assertEqual(
+            self.count_changelist_queries(PublisherLiveTestModel, 1, using='live'),
+            self.count_changelist_queries(PublisherLiveTestModel, 5, using='live'))
+
+    def test_changelist_published_filter(self):
+        published = PublisherTestModel.publisher_manager.create(title='Published')
+        published.publish()
+        PublisherTestModel.publisher_manager.create(title='Draft')
+
+        response = self.client.get('/admin/myapp/publishertestmodel/?published=1')
+        self.assertEqual(list(response.context['cl'].result_list), [published])
+
+    def test_changelist_dirty_filter(self):
+        published = PublisherTestModel.publisher_manager.create(title='Published')
+        published.publish()
+        draft = PublisherTestModel.publisher_manager.create(title='Draft')
+
+        response = self.client.get('/admin/myapp/publishertestmodel/?dirty=1')
+        self.assertEqual(list(response.context['cl'].result_list), [draft])
+        response = self.client.get('/admin/myapp/publishertestmodel/?dirty=0')
+        self.assertEqual(list(response.context['cl'].result_list), [published])
+
+    def test_batch_publish(self):
+        published = PublisherTestModel.publisher_manager.create(title='Published')
+        published.publish()
+        drafts = [
+            PublisherTestModel.publisher_manager.create(title='Draft %d' % i) for i in range(3)]
+
+        response = self.client.post('/admin/myapp/publishertestmodel/batch/', {
+            'publish': [draft.pk for draft in drafts],
+            'unpublish': [published.pk, 999],
+        })
+
+        self.assertEqual(response.status_code, 200)
+        results = json.loads(response.content.decode('utf-8'))['results']
+        self.assertEqual(results[str(drafts[0].pk)], {'success': True, 'published': True})
+        self.assertEqual(results[str(published.pk)], {'success': True, 'published': False})
+        self.assertEqual(results['999'], {'success': False, 'published': False})
+        self.assertEqual(
+            set(PublisherTestModel.publisher_manager.published().values_list('title', flat=True)),
+            set(['Draft 0', 'Draft 1', 'Draft 2']))
+
+    def test_batch_publish_split_storage(self):
+        draft = PublisherSplitTestModel.publisher_manager.create(title='Draft')
+
+        response = self.client.post('/admin/myapp/publishersplittestmodel/batch/', {
+            'publish': [draft.pk],
+        })
+
+        results = json.loads(response.content.decode('utf-8'))['results']
+        self.assertEqual(results[str(draft.pk)], {'success': True, 'published': True})
+
+    def test_batch_publish_live_database(self):
+        draft = PublisherLiveTestModel.publisher_manager.create(title='Draft')
+
+        response = self.client.post('/admin/myapp/publisherlivetestmodel/batch/', {
+            'publish': [draft.pk],
+        })
+
+        results = json.loads(response.content.decode('utf-8'))['results']
+        self.assertEqual(results[str(draft.pk)], {'success': True, 'published': True})
+
+    def test_batch_publish_rejects_invalid_requests(self):
+        url = '/admin/myapp/publishertestmodel/batch/'
+        self.assertEqual(self.client.get(url).status_code, 405)
+        self.assertEqual(self.client.post(url, {'publish': ['a']}).status_code, 400)
+        response = self.client.post(url, {'publish': [1], 'unpublish': [1]})
+        self.assertEqual(response.status_code, 400)
+
+
+class PublisherPermissionsTest(test.TestCase):
+
+    def test_update_permissions_adds_missing_permissions(self):
+        Permission.objects.filter(codename='can_publish').delete()
+        stdout = StringIO()
+
+        with self.assertNumQueries(3):
+            call_command('update_permissions', 'myapp', 'myapp', stdout=stdout)
+
+        self.assertTrue(Permission.objects.filter(
+            codename='can_publish',
+            content_type__model='publishertestmodel').exists())
+        self.assertIn('permission(s) added', stdout.getvalue())
+
+    def test_update_permissions_is_idempotent(self):
+        call_command('update_permissions', stdout=StringIO())
+        count = Permission.objects.count()
+        stdout = StringIO()
+
+        call_command('update_permissions', stdout=stdout)
+
+        self.assertEqual(Permission.objects.count(), count)
+        self.assertTrue(stdout.getvalue().startswith('0 permission(s) added'))
+
+
+class PublisherConcurrencyTest(test.TestCase):
+
+    def publish_concurrently(self, concurrency, retries=3, model=PublisherTestModel):
+        instance = model.publisher_manager.create(title='Test model')
+        first = model.objects.get(pk=instance.pk)
+        second = model.objects.get(pk=instance.pk)
+        for obj in (first, second):
+            obj.publisher_concurrency = concurrency
+            obj.publisher_publish_retries = retries
+
+        # Both copies of the draft were loaded before either is published
+        first.publish()
+        second.publish()
+        return second
+
+    def test_locked_publish(self):
+        second = self.publish_concurrently('lock')
+
+        published = PublisherTestModel.publisher_manager.published().get()
+        self.assertEqual(second.publisher_linked, published)
+
+    def test_optimistic_publish_retries_stale_draft(self):
+        second = self.publish_concurrently('optimistic')
+
+        published = PublisherTestModel.publisher_manager.published().get()
+        self.assertEqual(second.publisher_linked, published)
+
+    def test_optimistic_publish_raises_without_retries(self):
+        self.assertRaises(
+            PublisherConflictException, self.publish_concurrently, 'optimistic', retries=0)
+        self.assertEqual(PublisherTestModel.publisher_manager.published().count(), 1)
+
+    def test_optimistic_publish_split_storage(self):
+        self.assertRaises(
+            PublisherConflictException, self.publish_concurrently, 'optimistic', retries=0,
+            model=PublisherSplitTestModel)
+
+        second = self.publish_concurrently('optimistic', model=PublisherSplitTestModel)
+        self.assertFalse(second.is_dirty)
+        self.assertEqual(PublisherSplitTestModel.publisher_manager.published().count(), 2)
+
+    def test_optimistic_publish_of_fresh_draft(self):
+        instance = PublisherTestModel.publisher_manager.create(title='Test model')
+        instance.publisher_concurrency = 'optimistic'
+        instance.publish()
+        instance.title = 'Updated test model'
+        instance.save()
+        instance.publish()
+
+        published = PublisherTestModel.publisher_manager.published().get()
+        self.assertEqual(published.title, 'Updated test model')
+
+
+class PublisherBulkTest(test.TestCase):
+
+    def create_drafts(self, model, count, **kwargs):
+        return [
+            model.publisher_manager.create(title='Test model %d' % i, **kwargs)
+            for i in range(count)
+        ]
+
+    def count_bulk_publish_queries(self, model, count):
+        self.create_drafts(model, count)
+        with CaptureQueriesContext(connection) as queries:
+            model.publisher_manager.bulk_publish()
+        return len(queries)
+
+    def test_bulk_publish_publishes_dirty_drafts(self):
+        drafts = self.create_drafts(PublisherTestModel, 3)
+        drafts[0].publish()
+
+        published = PublisherTestModel.publisher_manager.bulk_publish()
+
+        self.assertEqual(len(published), 2)
+        self.assertEqual(PublisherTestModel.publisher_manager.published().count(), 3)
+        for draft in PublisherTestModel.publisher_manager.drafts():
+            self.assertEqual(draft.publisher_linked.title, draft.title)
+            self.assertFalse(draft.publisher_linked.publisher_linked)
+            self.assertIsNotNone(draft.publisher_published_at)
+            self.assertFalse(draft.is_dirty)
+
+    def test_bulk_publish_saves_draft_changes_of_receivers(self):
+        def receiver(sender, instance, **kwargs):
+            instance.title = 'Changed by receiver'
+
+        self.create_drafts(PublisherTestModel, 2)
+        publisher_publish_pre_save_draft.connect(receiver, sender=PublisherTestModel)
+        try:
+            PublisherTestModel.publisher_manager.bulk_publish()
+        finally:
+            publisher_publish_pre_save_draft.disconnect(receiver, sender=PublisherTestModel)
+
+        for draft in PublisherTestModel.publisher_manager.drafts():
+            self.assertEqual(draft.title, 'Changed by receiver')
+            self.assertFalse(draft.is_dirty)
+
+    def test_bulk_publish_replaces_published_records(self):
+        self.create_drafts(PublisherTestModel, 2)
+        PublisherTestModel.publisher_manager.bulk_publish()
+        for draft in PublisherTestModel.publisher_manager.drafts():
+            draft.title = 'Updated'
+            draft.save()
+
+        PublisherTestModel.publisher_manager.bulk_publish(PublisherTestModel.objects.all())
+
+        published = PublisherTestModel.publisher_manager.published()
+        self.assertEqual(list(published.values_list('title', flat=True)), ['Updated', 'Updated'])
+
+    def test_bulk_publish_queries_do_not_depend_on_drafts(self):
+        self.assertEqual(
+            self.count_bulk_publish_queries(PublisherTestModel, 2),
+            self.count_bulk_publish_queries(PublisherTestModel, 10))
+
+    def test_bulk_publish_split_storage(self):
+        drafts = self.create_drafts(PublisherSplitTestModel, 2)
+        drafts[0].publish()
+        drafts[0].title = 'Updated'
+        drafts[0].save()
+
+        PublisherSplitTestModel.publisher_manager.bulk_publish()
+
+        published = PublisherSplitTestModel.publisher_manager.published().order_by('pk')
+        self.assertEqual(
+            list(published.values_list('pk', 'title')),
+            [(drafts[0].pk, 'Updated'), (drafts[1].pk, 'Test model 1')])
+
+    def test_bulk_publish_clones_translations(self):
+        for title in ('First', 'Second'):
+            draft = PublisherTranslatedTestModel.publisher_manager.create()
+            draft.translations.create(language_code='en', title=title)
+
+        PublisherTranslatedTestModel.publisher_manager.bulk_publish()
+
+        published = PublisherTranslatedTestModel.publisher_manager.published()
+        self.assertEqual(
+            sorted(published.values_list('translations__title', flat=True)),
+            ['First', 'Second'])
+        self.assertEqual(PublisherVersion.objects.count(), 2)
+
+    def test_bulk_unpublish(self):
+        drafts = self.create_drafts(PublisherTestModel, 3)
+        PublisherTestModel.publisher_manager.bulk_publish()
+
+        unpublished = PublisherTestModel.publisher_manager.bulk_unpublish(
+            PublisherTestModel.objects.filter(pk__in=[drafts[0].pk, drafts[1].pk]))
+
+        self.assertEqual(len(unpublished), 2)
+        self.assertEqual(PublisherTestModel.publisher_manager.published().count(), 1)
+        self.assertIsNone(unpublished[0].publisher_published_at)
+        self.assertEqual(
+            PublisherTestModel.publisher_manager.drafts().filter(
+                publisher_linked__isnull=True).count(),
+            2)
+
+
+class PublisherReleaseTest(test.TestCase):
+
+    def test_release_publishes_drafts_of_several_models(self):
+        drafts = [
+            PublisherTestModel.publisher_manager.create(title='First'),
+            PublisherTestModel.publisher_manager.create(title='Second'),
+            PublisherSplitTestModel.publisher_manager.create(title='Third'),
+        ]
+        PublisherTestModel.publisher_manager.create(title='Not released')
+        release = Release.objects.create(name='Landing page')
+        release.add(*drafts)
+        release.add(drafts[0])
+
+        progress = []
+        stats = release.publish(progress=lambda model, done, total: progress.append(
+            (model, done, total)))
+
+        self.assertEqual(PublisherTestModel.publisher_manager.published().count(), 2)
+        self.assertEqual(PublisherSplitTestModel.publisher_manager.published().count(), 1)
+        self.assertEqual(stats['myapp.PublisherTestModel']['published'], 2)
+        self.assertEqual(stats['myapp.PublisherSplitTestModel']['published'], 1)
+        self.assertEqual(progress[-1][1:], (3, 3))
+        self.assertIsNotNone(release.published_at)
+        self.assertIsNotNone(release.publish_duration)
+
+    def test_release_remove(self):
+        draft = PublisherTestModel.publisher_manager.create(title='First')
+        release = Release.objects.create(name='Landing page')
+        release.add(draft)
+        release.remove(draft)
+
+        release.publish()
+        self.assertEqual(PublisherTestModel.publisher_manager.published().count(), 0)
+
+
+class PublisherRelationsTest(test.TestCase):
+
+    def create_draft(self, tags=2, items=2):
+        instance = PublisherRelatedTestModel.publisher_manager.create(title='Test model')
+        instance.tags.add(*[PublisherTestTag.objects.create(name='Tag %d' % i)
+                            for i in range(tags)])
+        for i in range(items):
+            instance.items.create(name='Item %d' % i)
+        return instance
+
+    def test_publish_clones_many_to_many_and_children(self):
+        instance = self.create_draft()
+
+        instance.publish()
+
+        published = instance.publisher_linked
+        self.assertEqual(
+            sorted(published.tags.values_list('name', flat=True)), ['Tag 0', 'Tag 1'])
+        self.assertEqual(
+            sorted(published.items.values_list('name', flat=True)), ['Item 0', 'Item 1'])
+        self.assertEqual(instance.items.count(), 2)
+
+    def test_republish_replaces_relations(self):
+        instance = self.create_draft()
+        instance.publish()
+        instance.items.all().delete()
+        instance.tags.remove(instance.tags.all()[0])
+        instance.save()
+
+        instance.publish()
+
+        published = instance.publisher_linked
+        self.assertEqual(published.tags.count(), 1)
+        self.assertEqual(published.items.count(), 0)
+
+    def test_publish_remaps_targets_to_published_versions(self):
+        target = PublisherTestModel.publisher_manager.create(title='Published target')
+        target.publish()
+        unpublished = PublisherTestModel.publisher_manager.create(title='Unpublished target')
+        instance = self.create_draft()
+        instance.related.add(target, unpublished)
+
+        instance.publish()
+
+        self.assertEqual(
+            list(instance.publisher_linked.related.all()), [target.publisher_linked])
+        self.assertEqual(instance.related.count(), 2)
+
+    def test_relations_queries_do_not_depend_on_related_objects(self):
+        few = self.create_draft(tags=1, items=1)
+        many = self.create_draft(tags=10, items=10)
+
+        with CaptureQueriesContext(connection) as few_queries:
+            few.publish()
+        with CaptureQueriesContext(connection) as many_queries:
+            many.publish()
+
+        self.assertEqual(len(few_queries), len(many_queries))
+
+    def test_bulk_publish_clones_relations(self):
+        drafts = [self.create_draft(), self.create_draft(tags=1, items=3)]
+
+        PublisherRelatedTestModel.publisher_manager.bulk_publish()
+
+        for draft, tags, items in zip(drafts, (2, 1), (2, 3)):
+            draft = PublisherRelatedTestModel.objects.get(pk=draft.pk)
+            self.assertEqual(draft.publisher_linked.tags.count(), tags)
+            self.assertEqual(draft.publisher_linked.items.count(), items)
+
+
+class PublisherCascadeTest(test.TestCase):
+
+    def create_graph(self, count):
+        authors = [
+            PublisherTestModel.publisher_manager.create(title='Author %d' % i)
+            for i in range(count)]
+        related = [
+            PublisherSplitTestModel.publisher_manager.create(title='Related %d' % i)
+            for i in range(count)]
+        parent = PublisherCascadeTestModel.publisher_manager.create(
+            title='Parent', author=authors[0])
+        children = []
+        for i in range(count):
+            child = PublisherCascadeTestModel.publisher_manager.create(
+                title='Child %d' % i, author=authors[i], parent=parent)
+            child.related.add(*related)
+            children.append(child)
+        return parent, children
+
+    def test_publish_cascade_publishes_references_first(self):
+        parent, children = self.create_graph(2)
+
+        children[0].publish(cascade=True)
+
+        self.assertEqual(
+            list(PublisherTestModel.publisher_manager.published().values_list(
+                'title', flat=True)),
+            ['Author 0'])
+        self.assertEqual(PublisherSplitTestModel.publisher_manager.published().count(), 2)
+        self.assertEqual(
+            sorted(PublisherCascadeTestModel.publisher_manager.published().values_list(
+                'title', flat=True)),
+            ['Child 0', 'Parent'])
+        self.assertIsNotNone(children[0].publisher_linked)
+
+    def test_publish_without_cascade(self):
+        parent, children = self.create_graph(1)
+
+        children[0].publish()
+
+        self.assertEqual(PublisherTestModel.publisher_manager.published().count(), 0)
+        self.assertEqual(PublisherCascadeTestModel.publisher_manager.published().count(), 1)
+
+    def test_bulk_publish_cascade(self):
+        parent, children = self.create_graph(3)
+
+        published = PublisherCascadeTestModel.publisher_manager.bulk_publish(
+            PublisherCascadeTestModel.objects.filter(pk__in=[child.pk for child in children]),
+            cascade=True)
+
+        self.assertEqual(len(published), 3 + 3 + 1 + 3)
+        self.assertEqual(PublisherCascadeTestModel.publisher_manager.published().count(), 4)
+        self.assertEqual(PublisherTestModel.publisher_manager.published().count(), 3)
+
+    def test_bulk_publish_cascade_queries_do_not_depend_on_objects(self):
+        def count_queries(count):
+            parent, children = self.create_graph(count)
+            with CaptureQueriesContext(connection) as queries:
+                PublisherCascadeTestModel.publisher_manager.bulk_publish(
+                    PublisherCascadeTestModel.objects.filter(
+                        pk__in=[child.pk for child in children]),
+                    cascade=True)
+            return len(queries)
+
+        self.assertEqual(count_queries(2), count_queries(6))
+
+    def test_cycle_is_detected(self):
+        first = PublisherCascadeTestModel.publisher_manager.create(title='First')
+        second = PublisherCascadeTestModel.publisher_manager.create(title='Second', parent=first)
+        first.parent = second
+        first.save()
+
+        with self.assertRaises(PublisherCycleException):
+            first.publish(cascade=True)
+        self.assertEqual(PublisherCascadeTestModel.publisher_manager.published().count(), 0)
+
+    def test_self_reference_is_not_a_cycle(self):
+        instance = PublisherCascadeTestModel.publisher_manager.create(title='Self')
+        instance.parent = instance
+        instance.save()
+
+        instance.publish(cascade=True)
+
+        self.assertEqual(PublisherCascadeTestModel.publisher_manager.published().count(), 1)
+
+
+class PublisherContentHashTest(test.TestCase):
+
+    def create_published(self, title='Test model'):
+        instance = PublisherHashedTestModel.publisher_manager.create(title=title)
+        instance.translations.create(language_code='en', title='Title')
+        instance.publish()
+        return PublisherHashedTestModel.objects.get(pk=instance.pk)
+
+    def test_saving_unchanged_content_is_not_dirty(self):
+        instance = self.create_published()
+        self.assertFalse(instance.is_dirty)
+
+        instance.save()
+
+        self.assertFalse(instance.is_dirty)
+        self.assertNotIn(instance, PublisherHashedTestModel.publisher_manager.dirty())
+
+    def test_changed_field_is_dirty(self):
+        instance = self.create_published()
+
+        instance.title = 'Changed'
+        instance.save()
+
+        self.assertTrue(instance.is_dirty)
+        self.assertEqual(list(PublisherHashedTestModel.publisher_manager.dirty()), [instance])
+
+        instance.title = 'Test model'
+        instance.save()
+        self.assertFalse(instance.is_dirty)
+
+    def test_changed_translation_is_dirty(self):
+        instance = self.create_published()
+
+        translation = instance.translations.get()
+        translation.title = 'Changed'
+        translation.save()
+
+        instance = PublisherHashedTestModel.objects.get(pk=instance.pk)
+        self.assertTrue(instance.is_dirty)
+        self.assertEqual(list(PublisherHashedTestModel.publisher_manager.dirty()), [instance])
+
+    def test_unchanged_republish_is_skipped(self):
+        instance = self.create_published()
+        published_pk = instance.publisher_linked_id
+
+        instance.save()
+        instance.publish()
+
+        self.assertEqual(instance.publisher_linked_id, published_pk)
+
+    def create_legacy(self):
+        # Published before adding the hash, then changed
+        instance = self.create_published('a')
+        PublisherHashedTestModel.objects.update(publisher_content_hash='')
+        PublisherHashedTestModel.objects.filter(pk=instance.pk).update(
+            title='b', publisher_modified_at=timezone.now())
+        return PublisherHashedTestModel.objects.get(pk=instance.pk)
+
+    def test_legacy_row_without_hash_is_dirty(self):
+        instance = self.create_legacy()
+
+        self.assertTrue(instance.is_dirty)
+        self.assertEqual(list(PublisherHashedTestModel.publisher_manager.dirty()), [instance])
+
+        instance.publish()
+
+        instance = PublisherHashedTestModel.objects.get(pk=instance.pk)
+        self.assertEqual(instance.publisher_linked.title, 'b')
+        self.assertFalse(instance.is_dirty)
+        self.assertEqual(PublisherHashedTestModel.publisher_manager.dirty().count(), 0)
+
+    def test_bulk_publish_legacy_row_without_hash(self):
+        instance = self.create_legacy()
+
+        PublisherHashedTestModel.publisher_manager.bulk_publish()
+
+        instance = PublisherHashedTestModel.objects.get(pk=instance.pk)
+        self.assertEqual(instance.publisher_linked.title, 'b')
+        self.assertFalse(instance.is_dirty)
+        self.assertEqual(PublisherHashedTestModel.publisher_manager.dirty().count(), 0)
+
+    def test_dirty_includes_unpublished_drafts(self):
+        self.create_published('Published')
+        draft = PublisherHashedTestModel.publisher_manager.create(title='Draft')
+
+        self.assertEqual(list(PublisherHashedTestModel.publisher_manager.dirty()), [draft])
+
+    def test_dirty_without_content_hash(self):
+        published = PublisherTestModel.publisher_manager.create(title='Published')
+        published.publish()
+        changed = PublisherTestModel.publisher_manager.create(title='Changed')
+        changed.publish()
+        changed.save()
+        draft = PublisherTestModel.publisher_manager.create(title='Draft')
+
+        self.assertEqual(
+            set(PublisherTestModel.publisher_manager.dirty()), set([changed, draft]))
+
+    def test_dirty_split_storage(self):
+        published = PublisherSplitTestModel.publisher_manager.create(title='Published')
+        published.publish()
+        draft = PublisherSplitTestModel.publisher_manager.create(title='Draft')
+
+        self.assertEqual(list(PublisherSplitTestModel.publisher_manager.dirty()), [draft])
+
+
+class PublisherDirtyFlagTest(test.TestCase):
+
+    def needs_publishing(self, model=PublisherTestModel):
+        return set(model.publisher_manager.needs_publishing().values_list('title', flat=True))
+
+    def test_flag_follows_saves_and_publishes(self):
+        instance = PublisherTestModel.publisher_manager.create(title='Test model')
+        self.assertEqual(self.needs_publishing(), set(['Test model']))
+
+        instance.publish()
+        self.assertEqual(self.needs_publishing(), set())
+        self.assertFalse(instance.publisher_linked.publisher_is_dirty)
+
+        instance.save()
+        self.assertEqual(self.needs_publishing(), set(['Test model']))
+
+        instance.unpublish()
+        self.assertEqual(self.needs_publishing(), set(['Test model']))
+
+    def test_flag_split_storage(self):
+        instance = PublisherSplitTestModel.publisher_manager.create(title='Test model')
+        instance.publish()
+        self.assertEqual(self.needs_publishing(PublisherSplitTestModel), set())
+
+        instance.title = 'Changed'
+        instance.save()
+        self.assertEqual(self.needs_publishing(PublisherSplitTestModel), set(['Changed']))
+
+        instance.revert_to_public()
+        self.assertEqual(self.needs_publishing(PublisherSplitTestModel), set())
+
+    def test_flag_bulk_paths(self):
+        for i in range(3):
+            PublisherTestModel.publisher_manager.create(title='Test model %d' % i)
+
+        PublisherTestModel.publisher_manager.bulk_publish()
+        self.assertEqual(self.needs_publishing(), set())
+
+        PublisherTestModel.publisher_manager.bulk_unpublish(
+            PublisherTestModel.objects.filter(title='Test model 0'))
+        self.assertEqual(self.needs_publishing(), set(['Test model 0']))
+
+    def test_flag_content_hash(self):
+        instance = PublisherHashedTestModel.publisher_manager.create(title='Test model')
+        instance.translations.create(language_code='en', title='Title')
+        instance.publish()
+
+        instance.save()
+        self.assertEqual(self.needs_publishing(PublisherHashedTestModel), set())
+
+        instance.translations.update(title='Changed')
+        instance.translations.get().save()
+        self.assertEqual(self.needs_publishing(PublisherHashedTestModel), set(['Test model']))
+
+    def test_refresh_dirty_flags(self):
+        instance = PublisherTestModel.publisher_manager.create(title='Published')
+        instance.publish()
+        PublisherTestModel.publisher_manager.create(title='Draft')
+        PublisherTestModel.objects.update(publisher_is_dirty=True)
+
+        PublisherTestModel.publisher_manager.refresh_dirty_flags()
+
+        self.assertEqual(self.needs_publishing(), set(['Draft']))
+
+
+@unittest.skipIf(six.PY2, 'asyncio requires Python 3')
+class PublisherAsyncTest(test.TransactionTestCase):
+
+    def setUp(self):
+        # The in-memory SQLite test database doesn't support concurrent writers
+        aio._executor.clear()
+        self.settings_override = self.settings(PUBLISHER_ASYNC_WORKERS=1)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        aio._executor.clear()
+
+    def run_async(self, *awaitables):
+        import asyncio
+        loop = asyncio.get_event_loop()
+        return loop.run_until_complete(asyncio.gather(*awaitables))
+
+    def test_apublish_aunpublish(self):
+        instances = [
+            PublisherTestModel.publisher_manager.create(title='Test model %d' % i)
+            for i in range(5)]
+
+        self.run_async(*[instance.apublish() for instance in instances])
+        self.assertEqual(PublisherTestModel.publisher_manager.published().count(), 5)
+
+        self.run_async(*[instance.aunpublish() for instance in instances[:2]])
+        self.assertEqual(PublisherTestModel.publisher_manager.published().count(), 3)
+
+    def test_arevert_to_public(self):
+        instance = PublisherSplitTestModel.publisher_manager.create(title='Test model')
+        instance.publish()
+        instance.title = 'Changed'
+        instance.save()
+
+        self.run_async(instance.arevert_to_public())
+
+        self.assertEqual(PublisherSplitTestModel.objects.get(pk=instance.pk).title, 'Test model')
+
+    def test_abulk_publish(self):
+        for i in range(3):
+            PublisherTestModel.publisher_manager.create(title='Test model %d' % i)
+
+        published, = self.run_async(PublisherTestModel.publisher_manager.abulk_publish())
+        self.assertEqual(len(published), 3)
+
+        unpublished, = self.run_async(PublisherTestModel.publisher_manager.abulk_unpublish())
+        self.assertEqual(len(unpublished), 3)
+
+
+class PublisherInstanceCacheTest(test.TransactionTestCase):
+
+    def setUp(self):
+        get_instance_cache().clear()
+
+    def create_published(self, slug='home', title='Home'):
+        instance = PublisherCachedTestModel.publisher_manager.create(slug=slug, title=title)
+        instance.publish()
+        return instance
+
+    def test_get_cached_hits_memory(self):
+        self.create_published()
+        manager = PublisherCachedTestModel.publisher_manager
+
+        first = manager.get_cached(slug='home')
+        with self.assertNumQueries(0):
+            second = manager.get_cached(slug='home')
+
+        self.assertEqual(second.title, 'Home')
+        self.assertEqual(second.pk, first.pk)
+        self.assertFalse(second.is_draft)
+        self.assertIsNot(second, first)
+
+    def test_publish_expires_entries(self):
+        instance = self.create_published()
+        PublisherCachedTestModel.publisher_manager.get_cached(slug='home')
+
+        instance.title = 'New home'
+        instance.save()
+        instance.publish()
+
+        self.assertEqual(
+            PublisherCachedTestModel.publisher_manager.get_cached(slug='home').title, 'New home')
+        self.assertEqual(PublisherGeneration.objects.get().generation, 2)
+
+    def test_generation_is_checked_once_per_request(self):
+        self.create_published()
+        manager = PublisherCachedTestModel.publisher_manager
+        manager.get_cached(slug='home')
+
+        # Another process publishes a change
+        manager.published().update(title='New home')
+        PublisherGeneration.objects.update(generation=models.F('generation') + 1)
+        self.assertEqual(manager.get_cached(slug='home').title, 'Home')
+
+        request_started.send(sender=self.__class__)
+        with self.assertNumQueries(2):
+            self.assertEqual(manager.get_cached(slug='home').title, 'New home')
+
+    def test_generation_ttl(self):
+        self.create_published()
+        cache = PublishedInstanceCache(ttl=60)
+        cache.get(PublisherCachedTestModel, slug='home')
+        PublisherCachedTestModel.publisher_manager.published().update(title='New home')
+        PublisherGeneration.objects.update(generation=models.F('generation') + 1)
+
+        request_started.send(sender=self.__class__)
+        self.assertEqual(cache.get(PublisherCachedTestModel, slug='home').title, 'Home')
+
+        cache.checked_at -= 61
+        self.assertEqual(cache.get(PublisherCachedTestModel, slug='home').title, 'New home')
+
+    def test_cache_size_is_bounded(self):
+        cache = PublishedInstanceCache(size=2)
+        for slug in ('first', 'second', 'third'):
+            self.create_published(slug=slug)
+            cache.get(PublisherCachedTestModel, slug=slug)
+
+        self.assertEqual(
+            [dict(key[1])['slug'] for key in cache.entries], ['second', 'third'])
+
+    def test_get_cached_without_opting_in(self):
+        instance = PublisherTestModel.publisher_manager.create(title='Test model')
+        instance.publish()
+
+        self.assertEqual(
+            PublisherTestModel.publisher_manager.get_cached(title='Test model'),
+            instance.publisher_linked)
+        self.assertFalse(PublisherGeneration.objects.exists())
+
+
+class PublisherDatabaseTest(test.TestCase):
+    multi_db = True
+
+    def create_draft(self, title='Test model'):
+        instance = PublisherLiveTestModel.publisher_manager.create(title=title)
+        instance.translations.create(language_code='en', title='Title')
+        instance.tags.add(PublisherTestTag.objects.create(name='Tag'))
+        instance.items.create(name='Item')
+        return instance
+
+    def test_publish_writes_into_live_database(self):
+        # The tags aren't published objects, they are shared by both databases
+        PublisherTestTag.objects.using('live').create(pk=1, name='Tag')
+        instance = self.create_draft()
+
+        instance.publish()
+
+        self.assertEqual(PublisherLiveTestModel.objects.count(), 1)
+        published = PublisherLiveTestModel.publisher_manager.published().get()
+        self.assertEqual(published.pk, instance.pk)
+        self.assertEqual(published._state.db, 'live')
+        self.assertEqual(published.title, 'Test model')
+        self.assertFalse(published.is_draft)
+        self.assertEqual(
+            list(published.translations.values_list('title', flat=True)), ['Title'])
+        self.assertEqual(list(published.tags.values_list('name', flat=True)), ['Tag'])
+        self.assertEqual(list(published.items.values_list('name', flat=True)), ['Item'])
+        self.assertEqual(instance.get_published_version(), published)
+        self.assertFalse(instance.is_dirty)
+        self.assertIsNotNone(instance.publisher_published_at)
+
+    def test_republish_replaces_live_copy(self):
+        instance = self.create_draft()
+        instance.publish()
+        instance.title = 'Changed'
+        instance.save()
+        instance.translations.update(title='Changed title')
+        self.assertTrue(instance.is_dirty)
+
+        instance.publish()
+
+        published = PublisherLiveTestModel.publisher_manager.published().get()
+        self.assertEqual(published.title, 'Changed')
+        self.assertEqual(
+            list(published.translations.values_list('title', flat=True)), ['Changed title'])
+        self.assertEqual(PublisherLiveTestItem.objects.using('live').count(), 1)
+
+    def test_unpublish_and_revert(self):
+        instance = self.create_draft()
+        instance.publish()
+        instance.title = 'Changed'
+        instance.save()
+
+        instance.revert_to_public()
+        self.assertEqual(PublisherLiveTestModel.objects.get().title, 'Test model')
+
+        instance.unpublish()
+        self.assertFalse(PublisherLiveTestModel.publisher_manager.published().exists())
+        self.assertFalse(PublisherLiveTestItem.objects.using('live').exists())
+        self.assertIsNone(instance.get_published_version())
+
+    def count_bulk_publish_live_queries(self, count):
+        for i in range(count):
+            self.create_draft('Test model %d' % i)
+        with CaptureQueriesContext(connections['live']) as queries:
+            PublisherLiveTestModel.publisher_manager.bulk_publish()
+        return len(queries)
+
+    def test_bulk_publish(self):
+        self.count_bulk_publish_live_queries(3)
+
+        self.assertEqual(PublisherLiveTestModel.publisher_manager.published().count(), 3)
+        self.assertEqual(PublisherLiveTestItem.objects.using('live').count(), 3)
+        self.assertFalse(PublisherLiveTestModel.publisher_manager.dirty().exists())
+
+        PublisherLiveTestModel.publisher_manager.bulk_unpublish()
+        self.assertFalse(PublisherLiveTestModel.publisher_manager.published().exists())
+        self.assertEqual(PublisherLiveTestModel.publisher_manager.dirty().count(), 3)
+
+    def test_bulk_publish_live_queries_do_not_depend_on_drafts(self):
+        few = self.count_bulk_publish_live_queries(2)
+        PublisherLiveTestModel.objects.all().delete()
+        self.assertEqual(few, self.count_bulk_publish_live_queries(6))
+
+
+class PublisherExchangeTest(test.TestCase):
+    multi_db = True
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def export(self, *labels, **options):
+        stderr = StringIO()
+        path = os.path.join(self.directory, options.pop('filename', 'export.jsonl'))
+        call_command('publisher_export', *labels, output=path, stderr=stderr, **options)
+        return path, stderr.getvalue()
+
+    def import_(self, path, **options):
+        stdout = StringIO()
+        call_command('publisher_import', path, stdout=stdout, **options)
+        return stdout.getvalue()
+
+    def test_round_trip_with_translations(self):
+        instance = PublisherTranslatedTestModel.publisher_manager.create()
+        instance.translations.create(language_code='en', title='Title')
+        instance.translations.create(language_code='fr', title='Titre')
+        instance.publish()
+        # Unpublished drafts aren't exported
+        PublisherTranslatedTestModel.publisher_manager.create()
+
+        path, output = self.export('myapp.PublisherTranslatedTestModel')
+        self.assertIn('Exported 1 object(s).', output)
+        PublisherTranslatedTestModel.objects.all().delete()
+
+        self.assertIn('Imported 1 object(s).', self.import_(path))
+
+        draft = PublisherTranslatedTestModel.publisher_manager.drafts().get()
+        self.assertEqual(draft.pk, instance.pk)
+        self.assertFalse(draft.is_dirty)
+        published = draft.get_published_version()
+        self.assertEqual(published.publisher_published_at, instance.publisher_published_at)
+        for obj in (draft, published):
+            self.assertEqual(
+                dict(obj.translations.values_list('language_code', 'title')),
+                {'en': 'Title', 'fr': 'Titre'})
+
+    def test_round_trip_in_batches(self):
+        for i in range(5):
+            PublisherTestModel.publisher_manager.create(title='Title %d' % i).publish()
+
+        path, output = self.export('myapp.PublisherTestModel', batch_size=2)
+        self.assertIn('Exported 5 object(s).', output)
+        with open(path) as stream:
+            rows = [json.loads(line) for line in stream]
+        self.assertEqual(
+            [row['fields']['title'] for row in rows], ['Title %d' % i for i in range(5)])
+
+        PublisherTestModel.objects.all().delete()
+        self.import_(path, batch_size=2)
+
+        self.assertEqual(
+            sorted(PublisherTestModel.publisher_manager.published()
+                                                       .values_list('title', flat=True)),
+            ['Title %d' % i for i in range(5)])
+        for draft in PublisherTestModel.publisher_manager.drafts():
+            self.assertEqual(draft.get_published_version().title, draft.title)
+
+    def test_export_to_stdout(self):
+        for i in range(2):
+            PublisherTestModel.publisher_manager.create(title='Title %d' % i).publish()
+        stdout = StringIO()
+        call_command('publisher_export', 'myapp.PublisherTestModel', stdout=stdout,
+                     stderr=StringIO())
+
+        lines = stdout.getvalue().splitlines()
+        self.assertEqual(
+            [json.loads(line)['fields']['title'] for line in lines], ['Title 0', 'Title 1'])
+
+        PublisherTestModel.objects.all().delete()
+        path = os.path.join(self.directory, 'stdout.jsonl')
+        with open(path, 'w') as stream:
+            stream.write(stdout.getvalue())
+        self.assertIn('Imported 2 object(s).', self.import_(path))
+
+    def test_export_skips_published_without_draft(self):
+        orphan = PublisherTestModel.publisher_manager.create(title='Orphan')
+        orphan.publish()
+        PublisherTestModel.objects.filter(pk=orphan.pk).update(publisher_linked=None)
+        instance = PublisherTestModel.publisher_manager.create(title='Title')
+        instance.publish()
+
+        path, output = self.export('myapp.PublisherTestModel')
+        self.assertIn('Exported 1 object(s).', output)
+        PublisherTestModel.objects.all().delete()
+
+        self.assertIn('Imported 1 object(s).', self.import_(path))
+        draft = PublisherTestModel.publisher_manager.drafts().get()
+        self.assertEqual(draft.get_published_version().title, 'Title')
+
+    def test_import_resets_sequences(self):
+        instance = PublisherTestModel.publisher_manager.create(title='Title')
+        instance.publish()
+        path, output = self.export('myapp.PublisherTestModel')
+        PublisherTestModel.objects.all().delete()
+
+        ops = connections['default'].ops
+        with patch.object(ops, 'sequence_reset_sql', return_value=[]) as sequence_reset_sql:
+            self.import_(path)
+        self.assertEqual(sequence_reset_sql.call_args[0][1], [PublisherTestModel])
+
+        created = PublisherTestModel.publisher_manager.create(title='Created')
+        self.assertGreater(created.pk, instance.publisher_linked_id)
+
+    def test_round_trip_gzip_split_storage(self):
+        instance = PublisherSplitTestModel.publisher_manager.create(title='Split')
+        instance.publish()
+
+        path, output = self.export('myapp.PublisherSplitTestModel', filename='export.jsonl.gz')
+        with gzip.open(path, 'rb') as stream:
+            self.assertEqual(len(stream.read().splitlines()), 1)
+        PublisherSplitTestModel.objects.all().delete()
+
+        self.import_(path)
+
+        draft = PublisherSplitTestModel.objects.get()
+        self.assertEqual(draft.pk, instance.pk)
+        self.assertEqual(draft.get_published_version().title, 'Split')
+
+    def test_round_trip_live_database(self):
+        instance = PublisherLiveTestModel.publisher_manager.create(title='Live')
+        instance.translations.create(language_code='en', title='Title')
+        instance.publish()
+
+        path, output = self.export('myapp.PublisherLiveTestModel')
+        PublisherLiveTestModel.objects.all().delete()
+        PublisherLiveTestModel.objects.using('live').all().delete()
+
+        self.import_(path)
+
+        published = PublisherLiveTestModel.publisher_manager.published().get()
+        self.assertEqual(published._state.db, 'live')
+        self.assertEqual(published.pk, instance.pk)
+        self.assertEqual(
+            list(published.translations.values_list('title', flat=True)), ['Title'])
+        draft = PublisherLiveTestModel.objects.get()
+        self.assertEqual(list(draft.translations.values_list('title', flat=True)), ['Title'])
+
+
+class PublisherIntegrityTest(test.TestCase):
+    multi_db = True
+
+    def check(self, *labels, **options):
+        stdout = StringIO()
+        call_command('publisher_check', *labels, stdout=stdout, **options)
+        return stdout.getvalue()
+
+    def test_consistent_tables(self):
+        PublisherTestModel.publisher_manager.create(title='Draft')
+        PublisherTestModel.publisher_manager.create(title='Published').publish()
+        PublisherSplitTestModel.publisher_manager.create(title='Published').publish()
+        PublisherLiveTestModel.publisher_manager.create(title='Published').publish()
+
+        self.assertIn('No inconsistencies found.', self.check())
+
+    def test_linked_rows(self):
+        published = PublisherTestModel.publisher_manager.create(title='Published')
+        published.publish()
+        orphan = PublisherTestModel.publisher_manager.create(title='Orphan')
+        orphan.publish()
+        # The draft was deleted, or the publish failed before linking the draft
+        PublisherTestModel.objects.filter(pk=orphan.pk).update(publisher_linked=None)
+        linked_to_draft = PublisherTestModel.publisher_manager.create(title='Linked')
+        PublisherTestModel.objects.filter(pk=linked_to_draft.pk).update(
+            publisher_linked=linked_to_draft.pk, publisher_is_dirty=False)
+        PublisherTestModel.objects.filter(pk=published.pk).update(publisher_published_at=None)
+
+        output = self.check('myapp.PublisherTestModel')
+        self.assertIn('myapp.publishertestmodel: 1 published row(s) without a draft', output)
+        self.assertIn('myapp.publishertestmodel: 1 draft(s) linked to a draft', output)
+        self.assertIn('Found 3 inconsistent row(s)', output)
+        self.assertEqual(PublisherTestModel.publisher_manager.published().count(), 2)
+
+        output = self.check('myapp.PublisherTestModel', fix=True, batch_size=1)
+        self.assertIn('Repaired', output)
+        self.assertIn('No inconsistencies found.', self.check('myapp.PublisherTestModel'))
+
+        self.assertEqual(
+            list(PublisherTestModel.publisher_manager.published()
+                                                     .values_list('title', flat=True)),
+            ['Published'])
+        linked_to_draft = PublisherTestModel.objects.get(pk=linked_to_draft.pk)
+        self.assertIsNone(linked_to_draft.publisher_linked_id)
+        self.assertTrue(linked_to_draft.publisher_is_dirty)
+        self.assertTrue(PublisherTestModel.objects.get(pk=orphan.pk).publisher_is_dirty)
+
+    def test_split_storage(self):
+        instance = PublisherSplitTestModel.publisher_manager.create(title='Published')
+        instance.publish()
+        PublisherSplitTestModel.objects.filter(pk=instance.pk).update(publisher_is_dirty=False)
+        PublisherSplitTestModel.publisher_published_model.objects.all().delete()
+
+        output = self.check('myapp.PublisherSplitTestModel')
+        self.assertIn('1 unpublished draft(s) flagged as published or clean', output)
+
+        self.check('myapp.PublisherSplitTestModel', fix=True)
+        instance = PublisherSplitTestModel.objects.get()
+        self.assertIsNone(instance.publisher_published_at)
+        self.assertTrue(instance.publisher_is_dirty)
+
+    def test_live_database(self):
+        instance = PublisherLiveTestModel.publisher_manager.create(title='Published')
+        instance.publish()
+        # Left behind by a draft deleted while the live database was unavailable
+        for pk in (instance.pk + 1, instance.pk + 2):
+            PublisherLiveTestModel.objects.using('live').create(
+                pk=pk, title='Orphan', publisher_is_draft=False)
+
+        output = self.check('myapp.PublisherLiveTestModel')
+        self.assertIn('2 published row(s) without a draft', output)
+
+        self.check('myapp.PublisherLiveTestModel', fix=True, batch_size=1)
+        self.assertEqual(
+            list(PublisherLiveTestModel.publisher_manager.published()
+                                                         .values_list('pk', flat=True)),
+            [instance.pk])
+
+
+class PublisherAutoPublishTest(test.TestCase):
+
+    def publish_pending(self, seconds):
+        return publish_pending(now=timezone.now() + datetime.timedelta(seconds=seconds))
+
+    def test_saves_are_coalesced(self):
+        instance = PublisherAutoTestModel.publisher_manager.create(title='First')
+        instance.title = 'Second'
+        instance.save()
+        PublisherTestModel.publisher_manager.create(title='Not auto-published')
+
+        self.assertEqual(PublisherPendingPublish.objects.count(), 1)
+        self.assertEqual(self.publish_pending(0), 0)
+        self.assertFalse(PublisherAutoTestModel.publisher_manager.published().exists())
+
+        self.assertEqual(self.publish_pending(11), 1)
+        self.assertEqual(
+            PublisherAutoTestModel.publisher_manager.published().get().title, 'Second')
+        self.assertFalse(PublisherPendingPublish.objects.exists())
+
+    def count_publish_queries(self, count):
+        for i in range(count):
+            PublisherAutoTestModel.publisher_manager.create(title='Title %d' % i)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.publish_pending(11), count)
+        return len(queries)
+
+    def test_bulk_publish(self):
+        few = self.count_publish_queries(2)
+        self.assertEqual(PublisherAutoTestModel.publisher_manager.published().count(), 2)
+        PublisherAutoTestModel.objects.all().delete()
+        self.assertEqual(few, self.count_publish_queries(6))
+
+    def test_unpublish_cancels_pending_publish(self):
+        instance = PublisherAutoTestModel.publisher_manager.create(title='Title')
+        instance.publish()
+        instance.unpublish()
+
+        self.assertFalse(PublisherPendingPublish.objects.exists())
+
+    def test_max_delay(self):
+        PublisherAutoTestModel.publisher_manager.create(title='Title')
+        PublisherPendingPublish.objects.update(
+            created_at=timezone.now() - datetime.timedelta(seconds=60))
+
+        self.assertEqual(self.publish_pending(0), 0)
+        with self.settings(PUBLISHER_AUTO_PUBLISH_MAX_DELAY=30):
+            self.assertEqual(self.publish_pending(0), 1)
+
+    def test_command(self):
+        PublisherAutoTestModel.publisher_manager.create(title='Title')
+        PublisherPendingPublish.objects.update(due_at=timezone.now())
+        stdout = StringIO()
+        call_command('publisher_publish_pending', stdout=stdout)
+        self.assertIn('Published 1 object(s).', stdout.getvalue())
+
+
+class PublisherKeysetPaginationTest(test.TestCase):
+
+    def setUp(self):
+        for i in range(5):
+            PublisherTestModel.publisher_manager.create(title='Title %d' % i).publish()
+        published = PublisherTestModel.publisher_manager.published()
+        now = timezone.now()
+        # Two objects share a publication date, the primary key breaks the tie
+        for i, pk in enumerate(published.order_by('pk').values_list('pk', flat=True)):
+            published.filter(pk=pk).update(
+                publisher_published_at=now + datetime.timedelta(seconds=min(i, 3)))
+
+    def get_page(self, cursor=None, **kwargs):
+        params = {'cursor': cursor} if cursor else {}
+        request = test.RequestFactory().get('/', params)
+        request.publisher_is_draft = False
+        kwargs.setdefault('paginate_by', 2)
+        response = PublisherListView.as_view(
+            model=PublisherTestModel, keyset_pagination=True, **kwargs)(request)
+        return response.context_data
+
+    def get_titles(self, context):
+        return [obj.title for obj in context['object_list']]
+
+    def test_next_and_previous_pages(self):
+        first = self.get_page()
+        self.assertEqual(self.get_titles(first), ['Title 4', 'Title 3'])
+        self.assertTrue(first['is_paginated'])
+        self.assertFalse(first['page_obj'].has_previous())
+        self.assertEqual(first['paginator'].count, 5)
+
+        second = self.get_page(first['page_obj'].next_cursor)
+        self.assertEqual(self.get_titles(second), ['Title 2', 'Title 1'])
+        third = self.get_page(second['page_obj'].next_cursor)
+        self.assertEqual(self.get_titles(third), ['Title 0'])
+        self.assertFalse(third['page_obj'].has_next())
+
+        previous = self.get_page(third['page_obj'].previous_cursor)
+        self.assertEqual(self.get_titles(previous), ['Title 2', 'Title 1'])
+        previous = self.get_page(previous['page_obj'].previous_cursor)
+        self.assertEqual(self.get_titles(previous), ['Title 4', 'Title 3'])
+        self.assertFalse(previous['page_obj'].has_previous())
+        self.assertTrue(previous['page_obj'].has_next())
+
+    def test_configured_ordering_without_count(self):
+        with self.assertNumQueries(1):
+            context = self.get_page(keyset_ordering=('title', ), keyset_count=False)
+            self.assertIsNone(context['paginator'].count)
+        self.assertEqual(self.get_titles(context), ['Title 0', 'Title 1'])
+
+        context = self.get_page(
+            context['page_obj'].next_cursor, keyset_ordering=('title', ), paginate_by=3)
+        self.assertEqual(self.get_titles(context), ['Title 2', 'Title 3', 'Title 4'])
+        self.assertFalse(context['page_obj'].has_next())
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(Http404):
+            self.get_page('invalid')
+
+
+class PublisherTestSitemap(PublisherSitemap):
+    model = PublisherTestModel
+    url_name = 'publishertestmodel_detail'
+    limit = 3
+    chunk_size = 2
+
+
+class PublisherSitemapTest(test.TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.drafts = []
+        for i in range(8):
+            instance = PublisherTestModel.publisher_manager.create(title='Title %d' % i)
+            instance.publish()
+            self.drafts.append(instance)
+        PublisherTestModel.publisher_manager.create(title='Unpublished')
+        self.published = list(PublisherTestModel.publisher_manager.published().order_by('pk'))
+
+    def get_urls(self, page):
+        return PublisherTestSitemap().get_urls(page=page, site=MagicMock(domain='example.com'))
+
+    def get_pages(self):
+        sitemap = PublisherTestSitemap()
+        return [self.get_urls(page) for page in range(1, sitemap.paginator.num_pages + 1)]
+
+    def test_pages(self):
+        pages = self.get_pages()
+        self.assertEqual([len(urls) for urls in pages], [3, 3, 2])
+
+        urls = [url for page_urls in pages for url in page_urls]
+        self.assertEqual(
+            [url['location'] for url in urls],
+            ['http://example.com/objects/%d/' % obj.pk for obj in self.published])
+        self.assertEqual(
+            [url['lastmod'] for url in urls],
+            [obj.publisher_modified_at for obj in self.published])
+
+    def test_pages_of_republished_objects(self):
+        # Every publish allocates a new primary key to the published copy
+        for i in range(4):
+            for draft in self.drafts[:3]:
+                draft.save()
+                draft.publish()
+
+        pages = self.get_pages()
+        self.assertEqual([len(urls) for urls in pages], [3, 3, 2])
+
+    def test_outdated_page_keys_cover_every_object(self):
+        self.get_pages()
+        self.drafts[0].save()
+        self.drafts[0].publish()
+        PublisherTestModel.publisher_manager.create(title='New').publish()
+
+        urls = [url for page_urls in self.get_pages() for url in page_urls]
+        self.assertEqual(
+            [url['location'] for url in urls],
+            ['http://example.com/objects/%d/' % obj.pk
+             for obj in PublisherTestModel.publisher_manager.published().order_by('pk')])
+
+    def test_page_queries_do_not_depend_on_page_number(self):
+        # The keys of the pages are cached, then each page is read in chunks
+        self.get_urls(1)
+        with self.assertNumQueries(3):
+            self.get_urls(1)
+        with self.assertNumQueries(3):
+            self.get_urls(2)
+
+    def test_latest_lastmod(self):
+        self.assertEqual(
+            PublisherTestSitemap().get_latest_lastmod(),
+            max(obj.publisher_modified_at for obj in self.published))
+
+
+class PublisherStatusTest(test.TestCase):
+    multi_db = True
+
+    def setUp(self):
+        published = PublisherTestModel.publisher_manager.create(title='Published')
+        published.publish()
+        PublisherTestModel.publisher_manager.create(title='Unpublished')
+        changed = PublisherTestModel.publisher_manager.create(title='Changed')
+        changed.publish()
+        changed.save()
+        PublisherSplitTestModel.publisher_manager.create(title='Split').publish()
+        PublisherLiveTestModel.publisher_manager.create(title='Live').publish()
+        PublisherLiveTestModel.publisher_manager.create(title='Unpublished')
+        PublisherAutoTestModel.publisher_manager.create(title='Scheduled')
+
+    def get_status(self, *labels):
+        stdout = StringIO()
+        call_command('publisher_status', *labels, json=True, stdout=stdout)
+        return json.loads(stdout.getvalue())
+
+    def test_counts(self):
+        status = self.get_status()
+
+        self.assertEqual(status['myapp.publishertestmodel'], {
+            'drafts': 3, 'published': 2, 'unpublished': 1, 'dirty': 2, 'scheduled': 0,
+        })
+        self.assertEqual(status['myapp.publishersplittestmodel']['published'], 1)
+        self.assertEqual(status['myapp.publishersplittestmodel']['unpublished'], 0)
+        self.assertEqual(status['myapp.publisherlivetestmodel']['published'], 1)
+        self.assertEqual(status['myapp.publisherlivetestmodel']['unpublished'], 1)
+        self.assertEqual(status['myapp.publisherautotestmodel']['scheduled'], 1)
+
+    def test_one_query_per_model(self):
+        # The pending publishes, then an aggregate per model
+        with self.assertNumQueries(3):
+            status = self.get_status('myapp.PublisherTestModel', 'myapp.PublisherAutoTestModel')
+        self.assertEqual(
+            list(status), ['myapp.publishertestmodel', 'myapp.publisherautotestmodel'])
+
+    def test_table(self):
+        stdout = StringIO()
+        call_command('publisher_status', 'myapp.PublisherTestModel', stdout=stdout)
+        lines = stdout.getvalue().splitlines()
+        self.assertEqual(lines[0].split(), [
+            'model', 'drafts', 'published', 'unpublished', 'dirty', 'scheduled'])
+        self.assertEqual(lines[1].split(), ['myapp.publishertestmodel', '3', '2', '1', '2', '0'])
+
+    def test_publish_model_list(self):
+        stdout = StringIO()
+        call_command('publish_model', 'myapp.models.PublisherTestModel', show_list=True,
+                     stdout=stdout)
+        unpublished = PublisherTestModel.publisher_manager.drafts().get(
+            publisher_linked__isnull=True)
+        self.assertEqual(
+            [line.split()[0] for line in stdout.getvalue().splitlines()], [str(unpublished.pk)])
+        self.assertEqual(PublisherTestModel.publisher_manager.published().count(), 2)
+
+    def test_publish_model_list_split_storage(self):
+        unpublished = PublisherSplitTestModel.publisher_manager.create(title='Unpublished')
+        stdout = StringIO()
+        call_command('publish_model', 'myapp.models.PublisherSplitTestModel', show_list=True,
+                     stdout=stdout)
+        self.assertEqual(stdout.getvalue().splitlines(), ['%s Unpublished' % unpublished.pk])
@@ -10,7 +10,11 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': 'mydatabase'
-    }
+    },
+    'live': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': 'mydatabase_live'
+    },
 }
 
 INSTALLED_APPS = (
@@ -3,8 +3,17 @@ from django.conf.urls import include, url
 
 from django.contrib import admin
 
+from publisher.views import PublisherDetailView
+
+from myapp.models import PublisherTestModel
+
 
 if django.VERSION >= (1, 9):
     urlpatterns = [url(r'^admin/', admin.site.urls)]
 else:
     urlpatterns = [url(r'^admin/', include(admin.site.urls))]
+
+urlpatterns += [
+    url(r'^objects/(?P<pk>\d+)/$', PublisherDetailView.as_view(model=PublisherTestModel),
+        name='publishertestmodel_detail'),
+]